@@ -23,9 +23,8 @@ from functools import partial
 from dremioai.api.transport import DremioAsyncHttpClient as AsyncHttpClient
 from dremioai.api.util import UStrEnum, run_in_parallel
 from dremioai.config import settings
-from csv import reader, excel
-from io import StringIO
 from functools import reduce
+import re
 
 
 class CatalogItemType(UStrEnum):
@@ -125,6 +124,22 @@ async def get_lineage(dataset_id_or_path: str) -> Dict[str, Any]:
     return result.model_dump()
 
 
+# a path component may start with a double quoted run, with "" standing for a
+# quote and an unclosed quote running to the end, followed by anything up to
+# the next dot; the same as reading the path as a csv row split on dots
+_PATH_COMPONENT = re.compile(r'(?:"((?:[^"]|"")*)"?)?([^.]*)')
+
+
+def split_path(path: str) -> List[str]:
+    parts, pos = [], 0
+    while True:
+        quoted, rest = (m := _PATH_COMPONENT.match(path, pos)).groups()
+        parts.append((quoted or "").replace('""', '"') + rest)
+        if (pos := m.end()) >= len(path):
+            return parts
+        pos += 1  # the dot
+
+
 async def get_schema(
     dataset_path_or_id: Optional[Union[List[str], str]],
     by_id: Optional[bool] = False,
@@ -138,9 +153,7 @@ async def get_schema(
         endpoint += "/" + dataset_path_or_id
     else:
         if isinstance(dataset_path_or_id, str):
-            dataset_path_or_id = list(
-                reader(StringIO(dataset_path_or_id), delimiter=".", dialect=excel)
-            )[0]
+            dataset_path_or_id = split_path(dataset_path_or_id)
         endpoint += f'/by-path/{"/".join(dataset_path_or_id)}'
     schema = await client.get(endpoint)
 
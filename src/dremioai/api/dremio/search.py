@@ -22,6 +22,8 @@ from pydantic import (
 )
 from typing import (
     List,
+    Dict,
+    Any,
     Union,
     Optional,
 )
@@ -213,9 +215,10 @@ class EnterpriseSearchResultsWrapper(BaseModel):
     results: List[EnterpriseSearchResultsObject] = Field(default_factory=list)
 
 
-async def get_search_results(
-    search: str | Search, use_df: bool = False
-) -> EnterpriseSearchResultsWrapper | pd.DataFrame:
+_TABLE_OR_VIEW = frozenset((Category.TABLE, Category.VIEW))
+
+
+async def _search(search: str | Search) -> List[EnterpriseSearchResultsObject]:
     if isinstance(search, str):
         search = Search(query=search)
 
@@ -241,16 +244,29 @@ async def get_search_results(
             body=search.model_dump(exclude_none=True),
             deser=EnterpriseSearchResults,
         )
+    return result
 
-    if use_df:
-        result = [r for r in result if r.category in (Category.TABLE, Category.VIEW)]
 
-        data = [r.catalog.as_df_dict() for r in result]
-        paths = [p["path"] for p in data]
-        if schemas := await get_schemas(paths, include_tags=True, flatten=True):
-            for ix, schema in enumerate(schemas):
-                data[ix]["schema"] = schema.get("schema")
+async def _tables_and_views(
+    result: List[EnterpriseSearchResultsObject],
+) -> List[Dict[str, Any]]:
+    data = [r.catalog.as_df_dict() for r in result if r.category in _TABLE_OR_VIEW]
+    paths = [d["path"] for d in data]
+    if schemas := await get_schemas(paths, include_tags=True, flatten=True):
+        for d, schema in zip(data, schemas):
+            d["schema"] = schema.get("schema")
+    return data
+
 
-        return pd.DataFrame(data=data)
+async def get_search_records(search: str | Search) -> List[Dict[str, Any]]:
+    return await _tables_and_views(await _search(search))
+
+
+async def get_search_results(
+    search: str | Search, use_df: bool = False
+) -> EnterpriseSearchResultsWrapper | pd.DataFrame:
+    result = await _search(search)
+    if use_df:
+        return pd.DataFrame(data=await _tables_and_views(result))
 
     return EnterpriseSearchResultsWrapper(results=result)
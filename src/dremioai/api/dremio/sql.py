@@ -157,6 +157,23 @@ class JobResultsParams(BaseModel):
     limit: Optional[int] = 500
 
 
+# the error of a failed job can carry a whole server side stack trace, only
+# its start is kept
+_MAX_ERROR_MESSAGE = 2048
+
+
+class JobFailedError(RuntimeError):
+    def __init__(self, job_id: str, message: str):
+        self.job_id = job_id
+        self.message = message[:_MAX_ERROR_MESSAGE]
+        super().__init__(f"Job {job_id} failed: {self.message}")
+
+
+# seconds between polls of a running job's state
+_POLL_INITIAL_DELAY = 0.05
+_POLL_MAX_DELAY = 0.5
+
+
 async def _fetch_results(
     uri: str, pat: str, project_id: str, job_id: str, off: int, limit: int
 ) -> JobResults:
@@ -177,6 +194,7 @@ async def get_results(
     uri: Optional[str] = None,
     pat: Optional[str] = None,
     client: Optional[AsyncHttpClient] = None,
+    max_rows: Optional[int] = None,
 ) -> JobResultsWrapper:
     if isinstance(qs, str):
         qs = QuerySubmission(id=qs)
@@ -186,8 +204,11 @@ async def get_results(
 
     endpoint = f"/v0/projects/{project_id}" if project_id else "/api/v3"
     job: Job = await client.get(f"{endpoint}/job/{qs.id}", deser=Job)
+    # short queries finish within a few polls, long ones settle to the max interval
+    delay = _POLL_INITIAL_DELAY
     while not job.done:
-        await asyncio.sleep(0.5)
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, _POLL_MAX_DELAY)
         job = await client.get(f"{endpoint}/job/{qs.id}", deser=Job)
 
     if not job.succeeded:
@@ -200,27 +221,32 @@ async def get_results(
                 else "Unknown error"
             )
         )
-        raise RuntimeError(f"Job {qs.id} failed: {emsg}")
+        raise JobFailedError(qs.id, emsg)
 
     if job.row_count == 0:
         return pd.DataFrame() if use_df else JobResultsWrapper([])
 
-    limit = min(500, job.row_count)
+    # only the pages holding the first max_rows rows are fetched
+    row_count = min(job.row_count, max_rows or job.row_count)
+    limit = min(500, row_count)
 
     results = await run_in_parallel(
         [
-            _fetch_results(uri, pat, project_id, qs.id, off, limit)
-            for off in range(0, job.row_count, limit)
+            _fetch_results(
+                uri, pat, project_id, qs.id, off, min(limit, row_count - off)
+            )
+            for off in range(0, row_count, limit)
         ]
     )
     jr = JobResultsWrapper(itertools.chain(r for r in results))
 
     if use_df:
+        schema = jr[0].result_schema or []
         df = pd.DataFrame(
             data=itertools.chain.from_iterable(jr.rows for jr in jr),
-            columns=[rs.name for rs in jr[0].result_schema],
+            columns=[rs.name for rs in schema] or None,
         )
-        for rs in jr[0].result_schema:
+        for rs in schema:
             if rs.type.name == "TIMESTAMP":
                 df[rs.name] = pd.to_datetime(df[rs.name])
         return df
@@ -229,7 +255,7 @@ async def get_results(
 
 
 async def run_query(
-    query: Union[Query, str], use_df: bool = False
+    query: Union[Query, str], use_df: bool = False, max_rows: Optional[int] = None
 ) -> Union[JobResultsWrapper, pd.DataFrame]:
     client = AsyncHttpClient()
     if not isinstance(query, Query):
@@ -240,4 +266,6 @@ async def run_query(
     qs: QuerySubmission = await client.post(
         f"{endpoint}/sql", body=query.model_dump(), deser=QuerySubmission
     )
-    return await get_results(project_id, qs, use_df=use_df, client=client)
+    return await get_results(
+        project_id, qs, use_df=use_df, client=client, max_rows=max_rows
+    )
@@ -15,7 +15,7 @@
 # 
 
 from pydantic import BaseModel, Field, AfterValidator
-from typing import List, Dict, Union, Optional, Any, Annotated
+from typing import List, Dict, Union, Optional, Any, Annotated, Callable
 from enum import auto, StrEnum
 from pathlib import Path
 from datetime import datetime
@@ -46,21 +46,42 @@ class Histogram(BaseModel):
     buckets: List[List[Union[str, float, int]]]
 
 
+def _convert_sample(v: List[Any]) -> List[Any]:
+    return [datetime.fromtimestamp(int(v[0])), float(v[1])] if len(v) >= 2 else []
+
+
+# keyed on the exact type of the value; values of any other type are kept as is
+_CONVERTERS: Dict[type, Callable[[Any], Any]] = {
+    list: _convert_sample,
+    int: datetime.fromtimestamp,
+    str: float,
+}
+
+
 def _convert_values(values: List[Any]) -> List[Any]:
-    for ix, v in enumerate(values):
-        if type(v) == list:
-            if len(v) >= 2:
-                v = [datetime.fromtimestamp(int(v[0])), float(v[1])]
-            else:
-                v = []
-        elif type(v) == int:
-            v = datetime.fromtimestamp(v)
-        elif type(v) == str:
-            v = float(v)
-        values[ix] = v
+    convert = _CONVERTERS.get
+    for ix, v in enumerate(values or ()):
+        if (conv := convert(type(v))) is not None:
+            values[ix] = conv(v)
     return values
 
 
+def _labels(metric: Dict[str, Any]) -> str:
+    return ",".join(f"{k}={v}" for k, v in metric.items() if not k.startswith("__"))
+
+
+def _series(metric: Dict[str, Any], samples: List[List[Any]]) -> Dict[str, Any]:
+    # one entry per series with its samples as parallel lists, rather than
+    # the name and labels repeated on every sample
+    times, values = zip(*samples) if samples else ((), ())
+    return {
+        "name": metric.get("__name__"),
+        "labels": _labels(metric),
+        "time": list(times),
+        "value": list(values),
+    }
+
+
 class Matrix(BaseModel):
     metric: Dict[str, Any]
     values: Annotated[Optional[List[List[Any]]], AfterValidator(_convert_values)] = (
@@ -72,12 +93,13 @@ class Matrix(BaseModel):
 
     def as_df(self) -> pd.DataFrame:
         df = pd.DataFrame(self.values, columns=["time", "value"])
-        df["labels"] = ",".join(
-            f"{k}={v}" for k, v in self.metric.items() if not k.startswith("__")
-        )
+        df["labels"] = _labels(self.metric)
         df["name"] = self.metric.get("__name__")
         return df
 
+    def as_series(self) -> Dict[str, Any]:
+        return _series(self.metric, [v for v in self.values or () if v])
+
 
 class InstantVector(BaseModel):
     metric: Dict[str, Any]
@@ -90,12 +112,13 @@ class InstantVector(BaseModel):
 
     def as_df(self) -> pd.DataFrame:
         df = pd.DataFrame([self.value], columns=["time", "value"])
-        df["labels"] = ",".join(
-            f"{k}={v}" for k, v in self.metric.items() if not k.startswith("__")
-        )
+        df["labels"] = _labels(self.metric)
         df["name"] = self.metric.get("__name__")
         return df
 
+    def as_series(self) -> Dict[str, Any]:
+        return _series(self.metric, [self.value] if self.value else [])
+
 
 class TimeSeriesData(BaseModel):
     type: Optional[TimeSeriesResultType] = Field(default=None, alias="resultType")
@@ -112,6 +135,21 @@ def _convert_results(
     return data.result
 
 
+def as_series(
+    data: List[Union[Matrix, InstantVector, List[Any]]],
+) -> List[Dict[str, Any]]:
+    # scalar and string results are a single [time, value] pair, kept as a
+    # series without a name or labels; a string value is kept as is
+    if data and not isinstance(data[0], (Matrix, InstantVector)):
+        t, v = data[:2]
+        try:
+            v = float(v)
+        except (TypeError, ValueError):
+            pass
+        return [_series({}, [[datetime.fromtimestamp(int(t)), v]])]
+    return [r.as_series() for r in data]
+
+
 class PromQLResult(BaseModel):
     status: PromQLResultStatus
     data: Annotated[TimeSeriesData, AfterValidator(_convert_results)]
@@ -14,11 +14,23 @@
 #  limitations under the License.
 #
 
-from aiohttp import ClientSession, ClientResponse, ClientResponseError
+from aiohttp import ClientSession, ClientResponse, ClientResponseError, TCPConnector
+from asyncio import AbstractEventLoop, get_running_loop
 from pathlib import Path
-from typing import AnyStr, Callable, Optional, Dict, TypeAlias, Union, TextIO
+from typing import (
+    AnyStr,
+    AsyncGenerator,
+    Callable,
+    Optional,
+    Dict,
+    Tuple,
+    TypeAlias,
+    Union,
+    TextIO,
+)
 from dremioai.log import logger
 from json import loads
+from dremioai.api.util import json_loads
 from pydantic import BaseModel, ValidationError
 
 from dremioai.config import settings
@@ -26,6 +38,51 @@ from dremioai.api.oauth2 import get_oauth2_tokens
 
 DeserializationStrategy: TypeAlias = Union[Callable, BaseModel]
 
+# downloads are streamed to the file in chunks of this size, so that memory
+# stays bounded without a read and write call per kilobyte
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# one pooled session per event loop, so that consecutive calls reuse open
+# connections instead of paying for a tcp and tls handshake each time. It is
+# keyed on the loop as the cli runs a fresh loop for every command
+_sessions: Dict[AbstractEventLoop, Tuple[ClientSession, AsyncGenerator]] = {}
+
+
+async def _closing(loop: AbstractEventLoop, session: ClientSession):
+    # loops finalize the async generators started on them when they shut down
+    # (asyncio.run and Runner both do), which closes the session with its loop
+    try:
+        yield
+    finally:
+        if _sessions.get(loop, (None,))[0] is session:
+            del _sessions[loop]
+        await session.close()
+
+
+async def _session() -> ClientSession:
+    loop = get_running_loop()
+    # entries of loops that were closed without finalizing them are dropped
+    for closed in [lp for lp in _sessions if lp.is_closed()]:
+        del _sessions[closed]
+
+    if (entry := _sessions.get(loop)) is None or entry[0].closed:
+        session = ClientSession(
+            connector=TCPConnector(
+                limit=100,
+                limit_per_host=20,
+                keepalive_timeout=30,
+                ttl_dns_cache=300,
+            )
+        )
+        entry = _sessions[loop] = (session, _closing(loop, session))
+        await anext(entry[1])
+    return entry[0]
+
+
+async def close_session():
+    if (entry := _sessions.get(get_running_loop())) is not None:
+        await entry[1].aclose()
+
 
 class AsyncHttpClient:
     def __init__(self, uri: AnyStr, token: AnyStr):
@@ -41,7 +98,7 @@ class AsyncHttpClient:
         pass
 
     async def download(self, response: ClientResponse, file: TextIO):
-        while chunk := await response.content.read(1024):
+        while chunk := await response.content.read(_DOWNLOAD_CHUNK_SIZE):
             file.write(chunk)
         file.flush()
 
@@ -51,21 +108,25 @@ class AsyncHttpClient:
         deser: DeserializationStrategy,
         top_level_list: bool = False,
     ):
-        js = await response.text()
+        # parsed straight from the body bytes, without decoding to str first
+        js = await response.read()
         try:
-            if deser is not None and issubclass(deser, BaseModel):
+            if deser is None:
+                return json_loads(js)
+            if isinstance(deser, type) and issubclass(deser, BaseModel):
                 if top_level_list:
-                    return [deser.model_validate(o) for o in loads(js)]
+                    return [deser.model_validate(o) for o in json_loads(js)]
                 return deser.model_validate_json(js)
+            # object hooks are only supported by the stdlib parser
             return loads(js, object_hook=deser)
         except ValidationError as e:
             logger().error(
-                f"in {response.request_info.method} {response.request_info.url}: {e.errors()}\ndata = {js}"
+                f"in {response.request_info.method} {response.request_info.url}: {e.errors()}\ndata = {js.decode(errors='replace')}"
             )
             raise RuntimeError(f"Unable to parse {e}, deser={deser}\n{e.errors()}")
         except Exception as e:
             logger().error(
-                f"in {response.request_info.method} {response.request_info.url} deser={deser}: unable to parse {js}: {e}"
+                f"in {response.request_info.method} {response.request_info.url} deser={deser}: unable to parse {js.decode(errors='replace')}: {e}"
             )
             raise
 
@@ -92,20 +153,18 @@ class AsyncHttpClient:
         file: Optional[TextIO] = None,
         top_level_list: bool = False,
     ):
-        async with ClientSession() as session:
-            logger().info(
-                f"{self.uri}{endpoint}', headers={self.headers}, params={params}"
+        # the headers carry the token, so only the request itself is logged
+        logger().debug("GET", url=f"{self.uri}{endpoint}", params=params)
+        async with (await _session()).get(
+            f"{self.uri}{endpoint}",
+            headers=self.headers,
+            json=body,
+            params=params,
+            ssl=False,
+        ) as response:
+            return await self.handle_response(
+                response, deser, file, top_level_list=top_level_list
             )
-            async with session.get(
-                f"{self.uri}{endpoint}",
-                headers=self.headers,
-                json=body,
-                params=params,
-                ssl=False,
-            ) as response:
-                return await self.handle_response(
-                    response, deser, file, top_level_list=top_level_list
-                )
 
     async def post(
         self,
@@ -115,13 +174,12 @@ class AsyncHttpClient:
         file: Optional[TextIO] = None,
         top_level_list: bool = False,
     ):
-        async with ClientSession() as session:
-            async with session.post(
-                f"{self.uri}{endpoint}", headers=self.headers, json=body, ssl=False
-            ) as response:
-                return await self.handle_response(
-                    response, deser, file, top_level_list=top_level_list
-                )
+        async with (await _session()).post(
+            f"{self.uri}{endpoint}", headers=self.headers, json=body, ssl=False
+        ) as response:
+            return await self.handle_response(
+                response, deser, file, top_level_list=top_level_list
+            )
 
 
 class DremioAsyncHttpClient(AsyncHttpClient):
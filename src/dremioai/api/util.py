@@ -14,10 +14,28 @@
 #  limitations under the License.
 # 
 
-from asyncio import Semaphore, gather
-from typing import List, Awaitable
+from asyncio import Semaphore, gather, Runner, AbstractEventLoop
+import asyncio
+from typing import List, Awaitable, Coroutine, Callable, Optional, Any
 from enum import StrEnum
 
+# orjson is an optional extra; the stdlib json module is used without it
+try:
+    from orjson import loads as json_loads, dumps as _dumps, OPT_INDENT_2
+
+    def json_dumps(
+        obj: Any, indent: bool = False, default: Optional[Callable] = None
+    ) -> bytes:
+        return _dumps(obj, default=default, option=OPT_INDENT_2 if indent else None)
+
+except ImportError:
+    from json import loads as json_loads, dumps as _dumps
+
+    def json_dumps(
+        obj: Any, indent: bool = False, default: Optional[Callable] = None
+    ) -> bytes:
+        return _dumps(obj, default=default, indent=2 if indent else None).encode()
+
 
 class UStrEnum(StrEnum):
     @staticmethod
@@ -33,3 +51,22 @@ async def run_in_parallel(coroutines: List[Awaitable], max_concurrent_tasks: int
             return await coroutine
 
     return await gather(*(sem_task(coroutine) for coroutine in coroutines))
+
+
+def event_loop_factory() -> Optional[Callable[[], AbstractEventLoop]]:
+    # uvloop is an optional extra; fall back to the default loop without it
+    try:
+        import uvloop
+
+        return uvloop.new_event_loop
+    except ImportError:
+        return None
+
+
+def run(coroutine: Coroutine, eager: bool = False) -> Any:
+    with Runner(loop_factory=event_loop_factory()) as runner:
+        # eager tasks (python 3.12+) run synchronously until their first real
+        # suspension, which suits short lived, one shot invocations
+        if eager and (factory := getattr(asyncio, "eager_task_factory", None)):
+            runner.get_loop().set_task_factory(factory)
+        return runner.run(coroutine)
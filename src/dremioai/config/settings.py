@@ -57,6 +57,11 @@ class Tools(BaseModel):
     server_mode: Annotated[
         Optional[Union[ToolType, int, str]], AfterValidator(_resolve_tools_settings)
     ] = Field(default=ToolType.FOR_SELF)
+    max_concurrent_tools: int = Field(
+        default=16,
+        gt=0,
+        description="most tool calls the mcp server runs at a time, others wait",
+    )
     model_config = ConfigDict(validate_assignment=True, use_enum_values=True)
 
     @field_serializer("server_mode")
@@ -128,6 +133,9 @@ class Dremio(BaseModel):
     )
     oauth2: Optional[OAuth2] = None
     allow_dml: Optional[bool] = False
+    max_result_rows: Optional[int] = Field(
+        default=None, gt=0, description="most rows of a query result to return"
+    )
     model_config = ConfigDict(validate_assignment=True)
 
     @field_serializer("raw_pat")
@@ -179,6 +187,7 @@ class LangChain(BaseModel):
     llm: Optional[Model] = None
     openai: Optional[OpenAi] = Field(default_factory=OpenAi)
     ollama: Optional[Ollama] = Field(default=None)
+    sliding_memory_size: int = Field(default=8, gt=0)
     model_config = ConfigDict(validate_assignment=True)
 
 
@@ -101,9 +101,9 @@ def configure(enable_json_logging=None, to_file=False):
         if enable_json_logging
         else structlog.dev.ConsoleRenderer()
     )
+    # records below the level are dropped first, so that they are never
+    # timestamped or formatted
     processors = [
-        structlog.processors.add_log_level,
-        structlog.processors.TimeStamper(),
         structlog.stdlib.filter_by_level,
         structlog.stdlib.add_logger_name,
         structlog.stdlib.add_log_level,
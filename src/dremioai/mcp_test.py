@@ -14,14 +14,16 @@
 #  limitations under the License.
 # 
 
-from dremioai import log
-from dremioai.servers import tools, mcp as mcp_server
-import os
+from dremioai.servers import mcp as mcp_server
 
 #log.configure(enable_json_logging=True, to_file=True)
-if mode := os.environ.get("MODE"):
-    mode = [tools.ToolType[m.upper()] for m in ','.split(mode)]
-app = mcp_server.init(mode=mode)
+
+def __getattr__(name: str):
+    # the server and its $MODE handling live in dremioai.servers.mcp, which
+    # builds it on first access
+    if name == "app":
+        return mcp_server.app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def dev():
     import mcp.cli.cli as cli
@@ -0,0 +1,90 @@
+#
+#  Copyright (C) 2017-2025 Dremio Corporation
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+
+from mcp.server import fastmcp
+from mcp.server.fastmcp.prompts import Prompt
+from mcp.server.fastmcp.resources import Resource
+from mcp.types import (
+    ContentBlock,
+    Prompt as MCPPrompt,
+    Resource as MCPResource,
+    Tool as MCPTool,
+)
+from asyncio import AbstractEventLoop, Semaphore, get_running_loop
+from typing import List, Dict, Any, Sequence
+
+
+class FastMCP(fastmcp.FastMCP):
+    """
+    FastMCP server that builds its listings once. Everything is registered when
+    the server is built, while clients may ask for the listings on every request,
+    so the listings are kept until something new is registered.
+
+    Tool calls are limited to max_concurrent_tools at a time; any others wait
+    for a slot, so that a burst of calls does not flood Dremio with queries.
+    The server is shared by whoever builds it, so the slots are kept per event
+    loop; a semaphore is bound to the loop it is first contended on.
+    """
+
+    def __init__(self, *args, max_concurrent_tools: int = 16, **kw):
+        self._listings: Dict[str, List[Any]] = {}
+        self._max_concurrent_tools = max_concurrent_tools
+        self._tool_slots: Dict[AbstractEventLoop, Semaphore] = {}
+        super().__init__(*args, **kw)
+
+    def _slots(self) -> Semaphore:
+        loop = get_running_loop()
+        if (slots := self._tool_slots.get(loop)) is None:
+            # a contended semaphore holds on to its loop, so entries of closed
+            # loops are dropped here rather than left to a weak reference
+            for closed in [lp for lp in self._tool_slots if lp.is_closed()]:
+                del self._tool_slots[closed]
+            slots = self._tool_slots[loop] = Semaphore(self._max_concurrent_tools)
+        return slots
+
+    async def call_tool(
+        self, name: str, arguments: Dict[str, Any]
+    ) -> Sequence[ContentBlock] | Dict[str, Any]:
+        async with self._slots():
+            return await super().call_tool(name, arguments)
+
+    async def list_tools(self) -> List[MCPTool]:
+        if (listing := self._listings.get("tools")) is None:
+            listing = self._listings["tools"] = await super().list_tools()
+        return listing
+
+    def add_tool(self, *args, **kw) -> None:
+        self._listings.pop("tools", None)
+        super().add_tool(*args, **kw)
+
+    async def list_resources(self) -> List[MCPResource]:
+        if (listing := self._listings.get("resources")) is None:
+            listing = self._listings["resources"] = await super().list_resources()
+        return listing
+
+    def add_resource(self, resource: Resource) -> None:
+        self._listings.pop("resources", None)
+        super().add_resource(resource)
+
+    async def list_prompts(self) -> List[MCPPrompt]:
+        if (listing := self._listings.get("prompts")) is None:
+            listing = self._listings["prompts"] = await super().list_prompts()
+        return listing
+
+    def add_prompt(self, prompt: Prompt) -> None:
+        self._listings.pop("prompts", None)
+        super().add_prompt(prompt)
@@ -14,7 +14,19 @@
 #  limitations under the License.
 #
 
-from typing import Union, Optional, Annotated, Any, AsyncGenerator, List, Dict
+from typing import (
+    Union,
+    Optional,
+    Annotated,
+    Any,
+    AsyncGenerator,
+    List,
+    Dict,
+    Callable,
+    ClassVar,
+    Tuple,
+    TypeAlias,
+)
 from beeai_framework.agents.react.agent import ReActAgent, ReActAgentRunOutput
 from beeai_framework.backend.chat import ChatModel
 from beeai_framework.backend.types import ChatModelParameters
@@ -41,9 +53,10 @@ from rich import print as pp
 
 import readline
 from rich.prompt import Prompt
-import asyncio
+from dremioai.api.util import run
 from dremioai.log import logger
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, AsyncExitStack
+import asyncio
 
 
 class AgentEvent(StrEnum):
@@ -56,7 +69,27 @@ class AgentEvent(StrEnum):
     NEW_TOKEN = auto()
 
 
+def _explain_error(data: Any) -> str:
+    if hasattr(data, "error"):
+        return FrameworkError(data.error).explain()
+    return str(data)
+
+
+def _describe_update(data: Any) -> str:
+    return f"Agent({data.update.key}): {data.update.parsed_value}"
+
+
 class ReactAgentWithSession:
+    # StrEnum members hash like their values, so event names index this directly
+    _handlers: ClassVar[Dict[str, Callable[[Any], str]]] = {
+        AgentEvent.ERROR: _explain_error,
+        AgentEvent.RETRY: lambda _: "Retrying...",
+        AgentEvent.UPDATE: _describe_update,
+        AgentEvent.START: lambda _: "Starting new iteration...",
+        AgentEvent.SUCCESS: lambda _: "Success",
+        AgentEvent.FINISH: lambda _: "Finished",
+    }
+
     def __init__(self, agent: ReActAgent, session: Optional[ClientSession] = None):
         self.agent = agent
         self.session = session
@@ -66,23 +99,9 @@ class ReactAgentWithSession:
 
     def process_events(self, data: Any, event: EventMeta) -> str:
         try:
-            match event.name:
-                case AgentEvent.ERROR.value:
-                    if hasattr(data, "error"):
-                        return FrameworkError(data.error).explain()
-                    return str(data)
-                case AgentEvent.RETRY.value:
-                    return "Retrying..."
-                case AgentEvent.UPDATE.value:
-                    return f"Agent({data.update.key}): {data.update.parsed_value}"
-                case AgentEvent.START.value:
-                    return "Starting new iteration..."
-                case AgentEvent.SUCCESS.value:
-                    return "Success"
-                case AgentEvent.FINISH.value:
-                    return "Finished"
-                case _:
-                    return event.name
+            if (handler := self._handlers.get(event.name)) is not None:
+                return handler(data)
+            return event.name
         except KeyError:
             return f"Unknown event: {event.path}, {event.name}"
 
@@ -96,6 +115,97 @@ class ReactAgentWithSession:
         )
 
 
+async def create_system_prompt(
+    mcp_session: ClientSession,
+) -> Dict[Any, PromptTemplate] | None:
+    tool_prompts = await mcp_session.list_prompts()
+    for tp in tool_prompts.prompts:
+        if tp.name == "system_prompt":
+            if (
+                pv := await mcp_session.get_prompt(tp.name)
+            ) is not None and pv.messages:
+                content = "\n".join(
+                    pm.content.text for pm in pv.messages if pm.content.type == "text"
+                )
+                sp = PromptTemplate(
+                    PromptTemplateInput(
+                        schema=type("SystemPrompt", (BaseModel,), {}),
+                        template=content,
+                    )
+                )
+                return {"user": sp}
+
+
+McpShared: TypeAlias = Tuple[
+    ClientSession, List[MCPTool], Dict[Any, PromptTemplate] | None
+]
+
+
+class _SharedMcpSession:
+    # anyio requires the subprocess and session to be closed by the task that
+    # opened them, so both live in a task of their own; whichever agent exits
+    # last only signals it to close
+    def __init__(self, server_params: StdioServerParameters):
+        self.agents = 0
+        self.ready: asyncio.Future[McpShared] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self.release = asyncio.Event()
+        self.task = asyncio.create_task(self._serve(server_params))
+
+    async def _serve(self, server_params: StdioServerParameters):
+        try:
+            async with AsyncExitStack() as stack:
+                read, write = await stack.enter_async_context(
+                    stdio_client(server_params)
+                )
+                mcp_session = await stack.enter_async_context(
+                    ClientSession(read, write)
+                )
+                await mcp_session.initialize()
+                tools = await MCPTool.from_client(mcp_session)
+                system_prompt = await create_system_prompt(mcp_session)
+                self.ready.set_result((mcp_session, tools, system_prompt))
+                await self.release.wait()
+        except BaseException as e:
+            if not self.ready.done():
+                self.ready.set_exception(e)
+            raise
+
+
+# The MCP server subprocess, its session and the tools/prompt listed from it are
+# shared by the agents open at the same time on one event loop with the same
+# server parameters; they are static for the lifetime of the session
+_mcp_shared: Dict[Tuple[asyncio.AbstractEventLoop, str], _SharedMcpSession] = {}
+
+
+@asynccontextmanager
+async def mcp_session(
+    server_params: StdioServerParameters,
+) -> AsyncGenerator[McpShared, None]:
+    key = (asyncio.get_running_loop(), server_params.model_dump_json())
+    # entries of loops that were closed with agents still open are dropped
+    for closed in [k for k in _mcp_shared if k[0].is_closed()]:
+        del _mcp_shared[closed]
+
+    if (shared := _mcp_shared.get(key)) is None:
+        shared = _mcp_shared[key] = _SharedMcpSession(server_params)
+    shared.agents += 1
+    try:
+        # shielded so that one cancelled agent does not fail the others
+        yield await asyncio.shield(shared.ready)
+    finally:
+        shared.agents -= 1
+        if shared.agents == 0:
+            if _mcp_shared.get(key) is shared:
+                del _mcp_shared[key]
+            shared.release.set()
+            try:
+                await shared.task
+            except Exception as e:
+                logger().warning(f"closing the MCP session failed: {e}")
+
+
 @asynccontextmanager
 async def create_react_agent(
     chat_model: Optional[
@@ -110,6 +220,7 @@ async def create_react_agent(
     :param chat_model_parameters: The chat model parameters.
     :return: A react agent.
     """
+    beeai = settings.instance().beeai
     if not isinstance(chat_model, ChatModel):
         chat_model = ChatModel.from_name(
             chat_model,
@@ -130,6 +241,8 @@ async def create_react_agent(
                 command=beeai.mcp_server.command, args=args, env=env
             )
 
+    sliding_memory_size = beeai.sliding_memory_size if beeai is not None else None
+
     def create_agent(
         chat_model: ChatModel,
         tools: Optional[List[MCPTool]] = None,
@@ -139,45 +252,14 @@ async def create_react_agent(
             llm=chat_model,
             tools=tools,
             templates=system_prompt,
-            memory=SlidingMemory(
-                SlidingMemoryConfig(size=settings.instance().beeai.sliding_memory_size)
-            ),
+            memory=SlidingMemory(SlidingMemoryConfig(size=sliding_memory_size)),
         )
 
-    async def create_system_prompt(
-        mcp_session: ClientSession,
-    ) -> Dict[Any, PromptTemplate] | None:
-        tool_prompts = await mcp_session.list_prompts()
-        for tp in tool_prompts.prompts:
-            if tp.name == "system_prompt":
-                if (
-                    pv := await mcp_session.get_prompt(tp.name)
-                ) is not None and pv.messages:
-                    content = "\n".join(
-                        pm.content.text
-                        for pm in pv.messages
-                        if pm.content.type == "text"
-                    )
-                    sp = PromptTemplate(
-                        PromptTemplateInput(
-                            schema=type("SystemPrompt", (BaseModel,), {}),
-                            template=content,
-                        )
-                    )
-                    return {"user": sp}
-
-    if (server_params := construct_stdio_params(settings.instance().beeai)) is not None:
-        async with (
-            stdio_client(server_params) as (read, write),
-            ClientSession(read, write) as mcp_session,
-        ):
-            await mcp_session.initialize()
-            tools = await MCPTool.from_client(mcp_session)
-
-            system_prompt = await create_system_prompt(mcp_session)
+    if (server_params := construct_stdio_params(beeai)) is not None:
+        async with mcp_session(server_params) as (session, tools, system_prompt):
             yield ReactAgentWithSession(
                 create_agent(chat_model, tools=tools, system_prompt=system_prompt),
-                mcp_session,
+                session,
             )
     else:
         yield ReactAgentWithSession(create_agent(chat_model), None)
@@ -208,8 +290,9 @@ def main(
     ] = settings.default_config(),
 ):
     settings.configure(config_file)
-    pp(settings.instance().model_dump())
-    if beeai := settings.instance().beeai:
+    cfg = settings.instance()
+    pp(cfg.model_dump())
+    if beeai := cfg.beeai:
         env_update = {}
         model = None
         if beeai.openai is not None:
@@ -231,20 +314,20 @@ def main(
     if model is None:
         raise ValueError(f"No chat model specified in {config_file}.")
 
-    logger().info(f"Starting {model} chat model with {settings.instance()}")
+    logger().info(f"Starting {model} chat model with {cfg}")
     history_file = Path("~/.mcp.history").expanduser()
     if not history_file.exists():
         history_file.touch()
     try:
-        readline.read_history_file("")
+        readline.read_history_file(history_file)
     except (FileNotFoundError, PermissionError) as _:
         pass
 
     try:
-        asyncio.run(do_chat(model, Prompt()))
+        run(do_chat(model, Prompt()))
     finally:
         try:
-            readline.write_history_file("/tmp/history")
+            readline.write_history_file(history_file)
         except (FileNotFoundError, PermissionError) as _:
             pass
 
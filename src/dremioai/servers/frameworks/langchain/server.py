@@ -15,35 +15,36 @@
 #
 
 
-from langchain_ollama import ChatOllama
-from langchain_openai import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langgraph.prebuilt import create_react_agent
-from langchain_core.messages import ToolMessage, AIMessage
 from langchain_core.language_models import LanguageModelLike
+from langchain_core.tools import BaseTool
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import load_mcp_tools
 
-from prompt_toolkit import PromptSession, print_formatted_text
-from prompt_toolkit.history import FileHistory
+from prompt_toolkit import PromptSession
+from prompt_toolkit.history import FileHistory, ThreadedHistory
 from prompt_toolkit.styles import Style
 from prompt_toolkit.formatted_text import HTML
 
 from dremioai.log import logger
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Any
 import sys
-import asyncio
+from dremioai.api.util import run
+from collections import deque
+from time import monotonic
 
-from typing import List, Optional, Annotated
+from typing import List, Optional, Annotated, Sequence
 from dremioai import log
 from dremioai.config import settings
 from typer import Typer, Option
 from rich.console import Console
 from rich.markdown import Markdown
+from rich.live import Live
 from dremioai.servers.frameworks.langchain.tools import (
     discover_tools,
     discover_prompt,
-    StructuredTool,
+    build_llm,
     ChatPromptTemplate,
 )
 
@@ -53,30 +54,77 @@ tl = Typer(
     help="Support for testing tools directly",
 )
 
+custom_style = Style.from_dict(
+    {
+        "prompt": "ansicyan",  # Input prompt color
+        "error": "ansired",  # Error messages color
+    }
+)
+
+
+def _content_text(content: Any) -> str:
+    if isinstance(content, list):
+        return "".join(
+            c.get("text", "") if isinstance(c, dict) else str(c) for c in content
+        )
+    return str(content)
+
+
+_REFRESH_PER_SECOND = 15
+
+
+async def stream_response(executor, args: Dict[str, Any], console: Console) -> str:
+    # render the answer as tokens arrive; each model step restarts the buffer so
+    # the value returned is the final answer after any tool calls. The markdown is
+    # re-parsed at most once per refresh rather than once per token
+    buf: List[str] = []
+    rendered = 0.0
+    with Live(
+        Markdown(""), console=console, refresh_per_second=_REFRESH_PER_SECOND
+    ) as live:
+        async for ev in executor.astream_events(args, version="v2"):
+            match ev["event"]:
+                case "on_chat_model_start":
+                    buf = []
+                case "on_chat_model_stream":
+                    if chunk := _content_text(ev["data"]["chunk"].content):
+                        buf.append(chunk)
+                        if (now := monotonic()) - rendered >= 1 / _REFRESH_PER_SECOND:
+                            live.update(Markdown("".join(buf)))
+                            rendered = now
+                case "on_tool_end":
+                    output = ev["data"].get("output")
+                    console.print(
+                        f"{ev['name']}: {_content_text(getattr(output, 'content', output))}",
+                        style="dim",
+                        markup=False,
+                    )
+        text = "".join(buf)
+        live.update(Markdown(text))
+    return text
+
 
 async def user_input(
-    tools: List[StructuredTool],
+    tools: Sequence[BaseTool],
     prompt: ChatPromptTemplate,
     llm: LanguageModelLike,
     debug: bool = False,
 ):
-    custom_style = Style.from_dict(
-        {
-            "prompt": "ansicyan",  # Input prompt color
-            "error": "ansired",  # Error messages color
-        }
-    )
+    # load the (possibly large) history file on a background thread, off the event loop
     session = PromptSession(
-        history=FileHistory(Path.home() / ".mcp.history"), style=custom_style
+        history=ThreadedHistory(FileHistory(Path.home() / ".mcp.history")),
+        style=custom_style,
     )
     executor = create_react_agent(
         model=llm,
-        tools=discover_tools(settings.instance().tools.server_mode),
-        prompt=discover_prompt(),
+        tools=tools,
+        prompt=prompt,
         debug=debug,
     )
 
-    chat_history = []
+    # keep only the most recent turns (a human and a system entry each), so the
+    # prompt size stays bounded however long the session runs
+    chat_history = deque(maxlen=2 * settings.instance().langchain.sliding_memory_size)
     console = Console()
 
     while True:
@@ -88,13 +136,9 @@ async def user_input(
             break
         args = {"messages": [("human", user_input)]}
         if chat_history:
-            args["chat_history"] = chat_history
-        response: Dict[str, List[ToolMessage, AIMessage]] = await executor.ainvoke(args)
-
-        console.print(Markdown(str(response["messages"][-1].content)))
-        chat_history.extend(
-            [("human", user_input), ("system", response["messages"][-1].content)]
-        )
+            args["chat_history"] = list(chat_history)
+        response = await stream_response(executor, args, console)
+        chat_history.extend([("human", user_input), ("system", response)])
 
 
 async def using_mcp(llm: LanguageModelLike, config_file: Path, debug: bool = False):
@@ -113,13 +157,12 @@ async def using_mcp(llm: LanguageModelLike, config_file: Path, debug: bool = Fal
             }
         }
     )
+    # the session stays open for the whole REPL; the loaded tools are bound to it
     async with client.session("dremioai") as session:
-        tools = await session.list_tools()
-        # prompt = await session.list_prompts()
-        # logger().info(f"Found prompt={prompt}")
+        tools = await load_mcp_tools(session)
         prompt = await session.get_prompt("System Prompt")
         prompt = discover_prompt(prompt.messages[0].content.text)
-        logger().info(f"Found {len(tools.tools)} tools and prompt={prompt}")
+        logger().info(f"Found {len(tools)} tools and prompt={prompt}")
         await user_input(tools, prompt, llm, debug)
 
 
@@ -144,27 +187,15 @@ def main(
 
     settings.configure(config_file)
 
-    if settings.instance().langchain.ollama is not None:
-        llm = ChatOllama(
-            model=settings.instance().langchain.ollama.model,
-            temperature=0,
-            verbose=True,
-        )
-    else:
-        llm = ChatOpenAI(
-            model=settings.instance().langchain.openai.model,
-            temperature=0,
-            verbose=True,
-            api_key=settings.instance().langchain.openai.api_key,
-        )
+    llm = build_llm()
 
     if use_as_mcp:
-        asyncio.run(using_mcp(llm, config_file, debug))
+        run(using_mcp(llm, config_file, debug))
     else:
         tools = discover_tools(settings.instance().tools.server_mode)
         prompt = discover_prompt()
-        logger().info(f"[non mcp] Found {len(tools.tools)} tools and prompt={prompt}")
-        asyncio.run(user_input(tools, prompt, llm, debug))
+        logger().info(f"[non mcp] Found {len(tools)} tools and prompt={prompt}")
+        run(user_input(tools, prompt, llm, debug))
 
 
 def cli():
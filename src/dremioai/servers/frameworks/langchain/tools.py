@@ -16,42 +16,209 @@
 from langchain_core.tools.structured import StructuredTool
 from langchain_core.tools.base import create_schema_from_function
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.messages import SystemMessage
+from langchain_core.language_models import LanguageModelLike
+from langchain_ollama import ChatOllama
+from langchain_openai import ChatOpenAI
 from dremioai.tools.tools import Tool, get_tools, ToolType, system_prompt
-from typing import Type, List
-from asyncio import run
+from dremioai.config import settings
+from dremioai.api.util import json_dumps
+from typing import (
+    Type,
+    List,
+    Dict,
+    Optional,
+    Callable,
+    Awaitable,
+    Any,
+    Tuple,
+    TYPE_CHECKING,
+)
+from functools import lru_cache, wraps
+from asyncio import run, ensure_future, shield, Future as AsyncFuture
+from concurrent.futures import Future, wait
+from threading import Thread
+import httpx
+
+if TYPE_CHECKING:
+    import tiktoken
+
+# tool docstrings are immutable, so the derived schemas only need to be built once
+_args_schemas: Dict[Type[Tool], Type] = {}
+
+
+def _args_schema(tool_class: Type[Tool]) -> Type:
+    if (schema := _args_schemas.get(tool_class)) is None:
+        schema = _args_schemas[tool_class] = create_schema_from_function(
+            tool_class.__name__, tool_class.invoke, parse_docstring=True
+        )
+    return schema
+
+
+def _coalesced(invoke: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    # the agent may issue the same tool call more than once in a single step;
+    # identical calls in flight at the same time share one round trip to Dremio.
+    # Skipped when DML is allowed, as repeated statements may then be intended
+    pending: Dict[str, AsyncFuture] = {}
+
+    @wraps(invoke)
+    async def _invoke(*args, **kw):
+        dremio = settings.instance().dremio
+        if dremio is not None and dremio.allow_dml:
+            return await invoke(*args, **kw)
+
+        key = repr((args, sorted(kw.items())))
+        if (task := pending.get(key)) is None:
+            task = pending[key] = ensure_future(invoke(*args, **kw))
+            task.add_done_callback(lambda _: pending.pop(key, None))
+        # shielded so that one cancelled caller does not cancel the others
+        return await shield(task)
+
+    return _invoke
+
+
+def _json_default(o: Any) -> Any:
+    # numpy scalars become plain numbers, anything else (e.g. timestamps) its str
+    return o.item() if hasattr(o, "item") else str(o)
+
+
+def _as_text(invoke: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[str]]:
+    # langchain falls back to the python repr of results it cannot json encode,
+    # which is what query records holding timestamps get; encode them here instead
+    @wraps(invoke)
+    async def _invoke(*args, **kw):
+        if isinstance(result := await invoke(*args, **kw), str):
+            return result
+        return json_dumps(result, default=_json_default).decode()
+
+    return _invoke
+
+
+# tiktoken downloads the encoding on first use, without a timeout, so it is
+# loaded in the background and waited on only briefly. Until it is available,
+# or for good when offline, descriptions are cut by characters instead
+_ENCODING_WAIT_SECONDS = 0.5
+_encoding_load: Optional[Future] = None
+
+
+def _load_encoding(loaded: Future):
+    try:
+        import tiktoken
+
+        loaded.set_result(tiktoken.get_encoding("cl100k_base"))
+    except Exception as e:
+        loaded.set_exception(e)
+
+
+def _encoding() -> Optional["tiktoken.Encoding"]:
+    global _encoding_load
+    if _encoding_load is None:
+        _encoding_load = Future()
+        Thread(target=_load_encoding, args=(_encoding_load,), daemon=True).start()
+        wait([_encoding_load], timeout=_ENCODING_WAIT_SECONDS)
+    if not _encoding_load.done() or _encoding_load.exception() is not None:
+        return None
+    return _encoding_load.result()
+
+
+# OpenAI rejects function descriptions longer than 1024 characters
+_MAX_DESCRIPTION_CHARS = 1024
+
+
+def _truncate_for_llm(doc: str, max_tokens: int = 256) -> str:
+    if (enc := _encoding()) is not None:
+        tokens = enc.encode(doc)
+        cut = enc.decode(tokens[:max_tokens]) if len(tokens) > max_tokens else doc
+    else:
+        cut = doc[: max_tokens * 4]  # roughly 4 characters per token
+    cut = cut[:_MAX_DESCRIPTION_CHARS]
+    if len(cut) < len(doc):
+        # prefer dropping a whole paragraph, or at least a whole word, over
+        # ending the description mid-sentence
+        if (ix := cut.rfind("\n\n")) > 0 or (ix := cut.rfind(" ")) > 0:
+            cut = cut[:ix]
+    return cut.rstrip()
 
 
 def instantiate(tool_class: Type[Tool]) -> StructuredTool:
     tool_instance = tool_class()
-    args_schema = create_schema_from_function(
-        tool_class.__name__, tool_instance.invoke, parse_docstring=True
-    )
+    args_schema = _args_schema(tool_class)
+    invoke = _as_text(tool_instance.invoke)
     return StructuredTool.from_function(
-        func=lambda *args, **kw: run(tool_instance.invoke(*args, **kw)),
+        func=lambda *args, **kw: run(invoke(*args, **kw)),
         name=tool_class.__name__,
-        description=tool_instance.invoke.__doc__[:1024],
+        description=_truncate_for_llm(tool_instance.invoke.__doc__ or ""),
         args_schema=args_schema,
-        coroutine=tool_instance.invoke,
+        coroutine=_coalesced(invoke),
         strict=False,
     )
 
 
-def discover_tools(For: ToolType = None) -> List[StructuredTool]:
-    return [instantiate(tool) for tool in get_tools(For=For)]
+@lru_cache(maxsize=8)
+def _discover_tools(
+    For: Optional[ToolType],
+    project_id: Optional[str],
+    enable_search: Optional[bool],
+) -> Tuple[StructuredTool, ...]:
+    return tuple(instantiate(tool) for tool in get_tools(For=For))
 
 
+def discover_tools(For: ToolType = None) -> Tuple[StructuredTool, ...]:
+    # the tools offered also depend on these settings, see tools.is_tool_for
+    dremio = settings.instance().dremio
+    return _discover_tools(
+        For,
+        dremio.project_id if dremio is not None else None,
+        dremio.enable_search if dremio is not None else None,
+    )
+
+
+@lru_cache(maxsize=8)
 def discover_prompt(with_prompt: str = None) -> ChatPromptTemplate:
     if with_prompt is None:
         with_prompt = system_prompt()
+    # the system messages are passed as literal messages rather than templates so
+    # that every turn starts with a byte-identical prefix, which lets the provider
+    # serve it from its prompt cache
     return ChatPromptTemplate.from_messages(
         [
-            ("system", with_prompt),
-            (
-                "system",
-                "You must respond in Markdown or tables in tab separated values format",
+            SystemMessage(content=with_prompt),
+            SystemMessage(
+                content="You must respond in Markdown or tables in tab separated values format"
             ),
             MessagesPlaceholder("chat_history", optional=True),
             MessagesPlaceholder("messages"),
             MessagesPlaceholder("agent_scratchpad", optional=True),
         ]
     )
+
+
+@lru_cache(maxsize=1)
+def _build_llm(
+    llm: settings.Model, model: str, api_key: Optional[str] = None
+) -> LanguageModelLike:
+    match llm:
+        case settings.Model.ollama:
+            return ChatOllama(model=model, temperature=0, verbose=True)
+        case settings.Model.openai:
+            # a pooled client keeps connections warm across REPL turns
+            return ChatOpenAI(
+                model=model,
+                temperature=0,
+                verbose=True,
+                api_key=api_key,
+                http_async_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_keepalive_connections=32, max_connections=64
+                    )
+                ),
+            )
+
+
+def build_llm() -> LanguageModelLike:
+    langchain = settings.instance().langchain
+    if langchain.ollama is not None:
+        return _build_llm(settings.Model.ollama, langchain.ollama.model)
+    return _build_llm(
+        settings.Model.openai, langchain.openai.model, langchain.openai.api_key
+    )
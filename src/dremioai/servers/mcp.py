@@ -14,52 +14,110 @@
 #  limitations under the License.
 #
 
-from mcp.server.fastmcp import FastMCP
-from mcp.server.fastmcp.prompts import Prompt
-from mcp.server.fastmcp.resources import FunctionResource
-from mcp.cli.claude import get_claude_config_path
-from pydantic.networks import AnyUrl
 from dremioai.tools import tools
 import os
-from typing import List, Union, Annotated, Optional, Tuple, Dict, Any
-from functools import reduce
-from operator import ior
+from typing import (
+    List,
+    Union,
+    Annotated,
+    Optional,
+    Type,
+    Dict,
+    Any,
+    Iterable,
+    TYPE_CHECKING,
+)
+from functools import lru_cache, cache
 from pathlib import Path
 from dremioai import log
 from typer import Typer, Option, Argument, BadParameter
-from rich import console, table, print as pp
 from click import Choice
 from dremioai.config import settings
-from dremioai.api.oauth2 import get_oauth2_tokens
 from enum import StrEnum, auto
-from json import load, dump as jdump
 from shutil import which
-import asyncio
-from yaml import dump, add_representer
+from dremioai.api.util import run, json_loads, json_dumps
+from dremioai.api.oauth2 import get_oauth2_tokens
+from pydantic.networks import AnyUrl
+from rich import print as pp, console, table
+from yaml import dump
 import sys
 
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper
+
+# the mcp server package is only imported once a server is built
+if TYPE_CHECKING:
+    from mcp.server.fastmcp import FastMCP
+    from mcp.server.fastmcp.tools import Tool
+
+
+def _fold(modes: Iterable[tools.ToolType]) -> tools.ToolType:
+    if isinstance(modes, tools.ToolType):
+        return modes
+    m = 0
+    for mode in modes:
+        m |= mode
+    return tools.ToolType(m)
+
 
 def init(
     uri: str = None,
     pat: str = None,
     project_id: str = None,
     mode: Union[tools.ToolType, List[tools.ToolType]] = None,
-) -> FastMCP:
-    mcp = FastMCP("Dremio", level="DEBUG")
-    mode = reduce(ior, mode) if mode is not None else None
-    for tool in tools.get_tools(For=mode):
-        tool_instance = tool()
-        mcp.add_tool(
-            tool_instance.invoke,
-            name=tool.__name__,
-            description=tool_instance.invoke.__doc__,
-        )
+) -> "FastMCP":
+    mode = _fold(mode) if mode is not None else None
+    # the tools offered also depend on these settings, see tools.is_tool_for
+    dremio = settings.instance().dremio
+    tool_settings = settings.instance().tools
+    return _build(
+        mode,
+        dremio.project_id if dremio is not None else None,
+        dremio.enable_search if dremio is not None else None,
+        tool_settings.max_concurrent_tools if tool_settings is not None else 16,
+    )
+
+
+@cache
+def _resource_url(path: str) -> AnyUrl:
+    # resource paths are fixed per resource class, so each is validated once
+    return AnyUrl(path)
 
+
+@cache
+def _tool(tool: Type[tools.Tools]) -> "Tool":
+    # the argument model is derived from the signature of invoke, so it is built
+    # once per tool class and shared by the servers for every mode
+    from mcp.server.fastmcp.tools import Tool
+
+    name, doc, _ = tools.get_tool_meta(tool)
+    return Tool.from_function(tool().invoke, name=name, description=doc)
+
+
+@lru_cache(maxsize=8)
+def _build(
+    mode: Optional[tools.ToolType],
+    project_id: Optional[str],
+    enable_search: Optional[bool],
+    max_concurrent_tools: int,
+) -> "FastMCP":
+    from dremioai.servers.fastmcp import FastMCP
+    from mcp.server.fastmcp.prompts import Prompt
+    from mcp.server.fastmcp.resources import FunctionResource
+
+    mcp = FastMCP(
+        "Dremio",
+        level="DEBUG",
+        tools=[_tool(tool) for tool in tools.get_tools(For=mode)],
+        max_concurrent_tools=max_concurrent_tools,
+    )
     for resource in tools.get_resources(For=mode):
         resource_instance = resource()
         mcp.add_resource(
             FunctionResource(
-                uri=AnyUrl(resource_instance.resource_path),
+                uri=_resource_url(resource_instance.resource_path),
                 name=resource.__name__,
                 description=resource.__doc__,
                 mime_type="application/json",
@@ -73,15 +131,27 @@ def init(
     return mcp
 
 
-app = None
-# if __name__ != "__main__":
-# if mode := os.environ.get("MODE"):
-# mode = [tools.ToolType[m.upper()] for m in ",".split(mode)]
-# app = init(mode=mode)
+# shared by every command that takes a --mode option
+_MODE_NAMES = tuple(tt.name for tt in tools.ToolType)
+_MODE_CHOICE = Choice(list(_MODE_NAMES))
+# the choice is case sensitive, so the names given are looked up as is
+_MODE_TABLE = {name: tools.ToolType[name] for name in _MODE_NAMES}
+
 
+def _mode_from_env() -> Optional[tools.ToolType]:
+    if mode := os.environ.get("MODE"):
+        return _fold(_MODE_TABLE[m.strip().upper()] for m in mode.split(","))
+    return None
 
-def _mode() -> List[str]:
-    return [tt.name for tt in tools.ToolType]
+
+def __getattr__(name: str) -> Any:
+    # `app` is for runners that load the server from this module; it is only
+    # built on first access, with the mode taken from $MODE
+    if name == "app":
+        global app
+        app = init(mode=_mode_from_env())
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 ty = Typer(context_settings=dict(help_option_names=["-h", "--help"]))
@@ -100,7 +170,7 @@ def main(
     ] = None,
     mode: Annotated[
         Optional[List[str]],
-        Option("-m", "--mode", help="MCP server mode", click_type=Choice(_mode())),
+        Option("-m", "--mode", help="MCP server mode", click_type=_MODE_CHOICE),
     ] = None,
     list_tools: Annotated[
         bool, Option(help="List available tools for this mode and exit")
@@ -114,7 +184,18 @@ def main(
     log.set_level("DEBUG")
 
     if mode is not None:
-        mode = [tools.ToolType[m.upper()] for m in mode]
+        mode = _fold(_MODE_TABLE[m] for m in mode)
+
+    if list_tools:
+        # only the project id bears on which tools are offered (see
+        # tools.is_tool_for), so the remaining overrides are not applied
+        settings.configure(config_file).get().with_overrides(
+            {"dremio.project_id": dremio_project_id}
+        )
+        log.logger().info(f"Listing available tools for mode={mode}")
+        for tool in tools.get_tools(For=mode):
+            print(tool.__name__)
+        return
 
     cfg = (
         settings.configure(config_file)
@@ -128,15 +209,7 @@ def main(
             }
         )
     )
-    if list_tools:
-        log.logger().info(f"Starting Dremio tools with {cfg}")
-        mode = reduce(ior, mode) if mode is not None else None
-        log.logger().info(f"Listing available tools for mode={mode}")
-        for tool in tools.get_tools(For=mode):
-            print(tool.__name__)
-        return
-
-    dremio = settings.instance().dremio
+    dremio = cfg.dremio
     if (
         dremio.oauth_supported
         and dremio.oauth_configured
@@ -151,7 +224,8 @@ def main(
         project_id=cfg.dremio.project_id,
         mode=cfg.tools.server_mode,
     )
-    app.run()
+    # same as app.run() for stdio, but on uvloop when it is installed
+    run(app.run_stdio_async())
 
 
 tc = Typer(
@@ -166,9 +240,11 @@ class ConfigTypes(StrEnum):
     claude = auto()
 
 
+@cache
 def get_claude_config_path() -> Path:
     # copy of the function from mcp sdk, but returns the path whether or not
-    # it exists
+    # it exists. The path only depends on the platform and environment, so it
+    # is computed once per process
     dir = Path(os.environ.get("XDG_CONFIG_HOME", Path.home() / ".config"), "Claude")
     match sys.platform:
         case "win32":
@@ -188,21 +264,22 @@ def show_default_config(
         Option(help="The type of configuration to show", show_default=True),
     ] = ConfigTypes.dremioai,
 ):
-
     match type:
         case ConfigTypes.dremioai:
             dc = settings.default_config()
             pp(f"Default config file: {dc!s} (exists = {dc.exists()!s})")
             if not show_filename:
-                settings.configure(dc)
                 pp(
                     dump(
-                        settings.instance().model_dump(
+                        settings.configure(dc)
+                        .get()
+                        .model_dump(
                             exclude_none=True,
                             mode="json",
                             exclude_unset=True,
                             by_alias=True,
-                        )
+                        ),
+                        Dumper=SafeDumper,
                     )
                 )
             pp(f"Default log file: {log.get_log_file()!s}")
@@ -210,7 +287,9 @@ def show_default_config(
             cc = get_claude_config_path()
             pp(f"Default config file: '{cc!s}' (exists = {cc.exists()!s})")
             if not show_filename:
-                jdump(load(cc.open()), sys.stdout, indent=2)
+                sys.stdout.write(
+                    json_dumps(json_loads(cc.read_bytes()), indent=True).decode()
+                )
 
 
 cc = Typer(
@@ -221,12 +300,21 @@ cc = Typer(
 tc.add_typer(cc)
 
 
-def create_default_mcpserver_config() -> Dict[str, Any]:
+@cache
+def _uv_path() -> Optional[str]:
+    # DREMIOAI_UV_PATH pins the uv executable and skips the PATH search
+    if (uv := os.environ.get("DREMIOAI_UV_PATH")) is not None:
+        return uv
     if (uv := which("uv")) is not None:
-        uv = Path(uv).resolve()
+        return os.fspath(Path(uv).resolve())
+    return None
+
+
+def create_default_mcpserver_config() -> Dict[str, Any]:
+    if (uv := _uv_path()) is not None:
         dir = str(Path(os.getcwd()).resolve())
         return {
-            "command": str(uv),
+            "command": uv,
             "args": ["run", "--directory", dir, "dremio-mcp-server", "run"],
         }
     else:
@@ -236,7 +324,7 @@ def create_default_mcpserver_config() -> Dict[str, Any]:
 def create_default_config_helper(dry_run: bool):
     cc = get_claude_config_path()
     dcmp = {"Dremio": create_default_mcpserver_config()}
-    c = load(cc.open()) if cc.exists() else {"mcpServers": {}}
+    c = json_loads(cc.read_bytes()) if cc.exists() else {"mcpServers": {}}
     c.setdefault("mcpServers", {}).update(dcmp)
     if dry_run:
         pp(c)
@@ -245,9 +333,12 @@ def create_default_config_helper(dry_run: bool):
     if not cc.exists():
         cc.parent.mkdir(parents=True, exist_ok=True)
 
-    with cc.open("w") as f:
-        jdump(c, f)
-        pp(f"Created default config file: {cc!s}")
+    # written next to the target and renamed over it, so that Claude never
+    # reads a partially written config
+    tmp = cc.with_name(cc.name + ".tmp")
+    tmp.write_bytes(json_dumps(c))
+    os.replace(tmp, cc)
+    pp(f"Created default config file: {cc!s}")
 
 
 @cc.command("claude", help="Create a default configuration file for Claude")
@@ -279,7 +370,7 @@ def create_default_config(
     ] = None,
     mode: Annotated[
         Optional[List[str]],
-        Option("-m", "--mode", help="MCP server mode", click_type=Choice(_mode())),
+        Option("-m", "--mode", help="MCP server mode", click_type=_MODE_CHOICE),
     ] = [tools.ToolType.FOR_DATA_PATTERNS.name],
     enable_search: Annotated[bool, Option(help="Enable semantic search")] = False,
     oauth_client_id: Annotated[
@@ -290,7 +381,7 @@ def create_default_config(
         bool, Option(help="Dry run, do not overwrite the config file. Just print it")
     ] = False,
 ):
-    mode = "|".join([tools.ToolType[m.upper()].name for m in mode])
+    mode = "|".join(_MODE_TABLE[m].name for m in mode)
     dremio = settings.Dremio.model_validate(
         {
             "uri": uri,
@@ -305,13 +396,14 @@ def create_default_config(
         }
     )
     ts = settings.Tools.model_validate({"server_mode": mode})
-    settings.configure(settings.default_config(), force=True)
-    settings.instance().dremio = dremio
-    settings.instance().tools = ts
-    if (d := settings.write_settings(dry_run=dry_run)) is not None and dry_run:
+    dc = settings.default_config()
+    s = settings.configure(dc, force=True).get()
+    s.dremio = dremio
+    s.tools = ts
+    if (d := settings.write_settings(dc, s, dry_run=dry_run)) is not None and dry_run:
         pp(d)
     elif not dry_run:
-        pp(f"Created default config file: {settings.default_config()!s}")
+        pp(f"Created default config file: {dc!s}")
 
 
 # --------------------------------------------------------------------------------
@@ -325,6 +417,11 @@ tl = Typer(
 
 # tl.add_typer(call)
 
+# every tool class is registered once dremioai.tools is imported; whether a tool
+# is available still depends on the settings, so that is checked per invocation
+_for_all = _fold(tools.ToolType.__members__.values())
+_tools_by_name = {t.__name__: t for t in tools.get_tools()}
+
 
 @tl.command(
     name="list",
@@ -334,10 +431,24 @@ tl = Typer(
 def tools_list(
     mode: Annotated[
         Optional[List[str]],
-        Option("-m", "--mode", help="MCP server mode", click_type=Choice(_mode())),
+        Option("-m", "--mode", help="MCP server mode", click_type=_MODE_CHOICE),
     ] = [tools.ToolType.FOR_SELF.name],
 ):
-    mode = reduce(ior, [tools.ToolType[m.upper()] for m in mode])
+    mode = _fold(_MODE_TABLE[m] for m in mode)
+    rows = (
+        (name, doc or "No Description", For.name)
+        for name, doc, For in map(tools.get_tool_meta, tools.get_tools(For=mode))
+    )
+
+    if not sys.stdout.isatty():
+        # when piped, skip the table layout and emit one JSON object per tool
+        out = sys.stdout.buffer
+        for name, doc, For in rows:
+            out.write(json_dumps({"tool": name, "description": doc, "for": For}))
+            out.write(b"\n")
+        out.flush()
+        return
+
     tab = table.Table(
         table.Column("Tool", justify="left", style="cyan"),
         "Description",
@@ -345,16 +456,21 @@ def tools_list(
         title="Tools list",
         show_lines=True,
     )
-
-    for tool in tools.get_tools(For=mode):
-        For = tools.get_for(tool)
-        try:
-            tab.add_row(tool.__name__, tool.invoke.__doc__.strip(), For.name)
-        except Exception as e:
-            tab.add_row(tool.__name__, "No Description", For.name)
+    for row in rows:
+        tab.add_row(*row)
     console.Console().print(tab)
 
 
+def _to_kwargs(args: List[str]) -> Dict[str, str]:
+    kwargs = {}
+    for arg in args:
+        k, sep, v = arg.partition("=")
+        if not sep:
+            raise BadParameter(f"Argument {arg} is not in the form arg=value")
+        kwargs[k] = v
+    return kwargs
+
+
 @tl.command(
     name="invoke",
     help="Execute an available tools",
@@ -371,24 +487,14 @@ def tools_exec(
         Argument(help="The arguments to pass to the tool (arg=value ...)"),
     ] = None,
 ):
-    def _to_kw(arg: str) -> Tuple[str, str]:
-        if "=" not in arg:
-            raise BadParameter(f"Argument {arg} is not in the form arg=value")
-        return tuple(arg.split("=", 1))
-
     settings.configure(config_file)
 
-    if args is None:
-        args = {}
-    elif type(args) == str:
-        args = [args]
-    args = dict(map(_to_kw, args))
-    for_all = reduce(ior, tools.ToolType.__members__.values())
-    all_tools = {t.__name__: t for t in tools.get_tools(for_all)}
-
-    if selected := all_tools.get(tool):
+    args = _to_kwargs(args) if args is not None else {}
+    if (selected := _tools_by_name.get(tool)) is not None and tools.is_tool_for(
+        selected, _for_all
+    ):
         tool_instance = selected()  # get arguments from settings
-        result = asyncio.run(tool_instance.invoke(**args))
+        result = run(tool_instance.invoke(**args), eager=True)
         pp(result)
     else:
         raise BadParameter(f"Tool {tool} not found")
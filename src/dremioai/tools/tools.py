@@ -17,6 +17,7 @@
 from typing import (
     List,
     Dict,
+    Tuple,
     Any,
     Optional,
     Literal,
@@ -29,11 +30,15 @@ from typing import (
 )
 
 from pathlib import Path
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import chain
 from enum import auto, IntFlag
 from dremioai import log
 import re
+import asyncio
 
+import numpy as np
 import pandas as pd
 
 from pathlib import Path
@@ -44,10 +49,6 @@ from dremioai.config.tools import ToolType
 from dremioai.api.prometheus import vm
 from dremioai.api.dremio.catalog import get_schema, get_lineage, get_descriptions
 from dremioai.api.util import run_in_parallel
-from csv import reader
-from io import StringIO
-from sqlglot import parse_one
-from sqlglot import expressions
 
 logger = log.logger(__name__)
 
@@ -83,13 +84,41 @@ class Tool:
     function: Optional[Function] = None
 
     def as_dict(self) -> Dict[str, Any]:
-        d = asdict(self)
-        if not self.function.parameters.properties:
-            del d["function"]["parameters"]
+        # built by hand, as asdict deep copies every value in the tree
+        f, p = self.function, self.function.parameters
+        d = {
+            "type": self.type,
+            "function": {"name": f.name, "description": f.description},
+        }
+        if p.properties:
+            d["function"]["parameters"] = {
+                "type": p.type,
+                "properties": {
+                    k: {"type": v.type, "description": v.description}
+                    for k, v in p.properties.items()
+                },
+                "required": list(p.required),
+            }
         return d
 
 
+# every tool and resource class, in the order they are defined
+_TOOL_CLASSES: List[type] = []
+_RESOURCE_CLASSES: List[type] = []
+
+
 class Tools:
+    # read from the class var hints of each tool once, when it is defined
+    _for: Optional[ToolType] = None
+    _project_id_required: Optional[bool] = None
+    _registry: ClassVar[List[type]] = _TOOL_CLASSES
+
+    def __init_subclass__(cls, **kw):
+        super().__init_subclass__(**kw)
+        cls._registry.append(cls)
+        cls._for = _get_class_var_hints(cls, "For")
+        cls._project_id_required = _get_class_var_hints(cls, "project_id_required")
+
     def __init__(self, uri=None, pat=None, project_id=None):
         settings.instance().with_overrides(
             {"dremio.uri": uri, "dremio.pat": pat, "dremio.project_id": project_id}
@@ -137,22 +166,52 @@ def _get_class_var_hints(tool: Tools, name: str) -> bool:
                 return annot[-1]
 
 
-get_for = lambda tool: _get_class_var_hints(tool, "For")
-get_project_id_required = lambda tool: _get_class_var_hints(tool, "project_id_required")
+get_for = lambda tool: tool._for
+get_project_id_required = lambda tool: tool._project_id_required
+
+# the name, description and mode of a tool are fixed per class, so they are
+# worked out once rather than on every server build or listing
+_TOOL_META: Dict[type, Tuple[str, str, Optional[ToolType]]] = {}
+
+
+def get_tool_meta(tool: Tools) -> Tuple[str, str, Optional[ToolType]]:
+    if (meta := _TOOL_META.get(tool)) is None:
+        meta = _TOOL_META[tool] = (
+            tool.__name__,
+            (tool.invoke.__doc__ or "").strip(),
+            get_for(tool),
+        )
+    return meta
 
 
 def is_tool_for(
     tool: Tools, tool_type: ToolType, dremio: settings.Dremio = None
 ) -> bool:
-    if dremio is None and settings.instance().dremio:
+    if dremio is None:
         dremio = settings.instance().dremio
+    if dremio is None:
+        return _is_tool_for(tool, tool_type, None, False)
+    return _is_tool_for(
+        tool, tool_type, dremio.project_id is not None, bool(dremio.enable_search)
+    )
+
 
+# flag arithmetic on ToolType runs through python level enum code, so the
+# answer is kept for each tool, mode and the few settings it depends on. The
+# tools are fixed, so the bound only matters for ad hoc tool type values
+@lru_cache(maxsize=1024)
+def _is_tool_for(
+    tool: Tools,
+    tool_type: ToolType,
+    has_project_id: Optional[bool],
+    enable_search: bool,
+) -> bool:
     if project_id_required := get_project_id_required(tool):
-        if dremio is not None and dremio.project_id is None:
+        if has_project_id is False:
             return False
 
     if (For := get_for(tool)) is not None:
-        if For & ToolType.EXPERIMENTAL and not dremio.enable_search:
+        if For & ToolType.EXPERIMENTAL and not enable_search:
             return False
         return (For & tool_type) != 0  # == tool_type
     return False
@@ -161,8 +220,64 @@ def is_tool_for(
 class GetFailedJobDetails(Tools):
     For: ClassVar[Annotated[ToolType, ToolType.FOR_SELF]]
 
-    def group_by(self, df, by):
-        return df.groupby(by).size().reset_index(name="count").to_dict(orient="records")
+    # every breakdown is a rollup of one count over all of these keys, so the
+    # rows are only hashed once
+    _keys: ClassVar[List[str]] = [
+        "date",
+        "queryType",
+        "state",
+        "engine",
+        "user",
+        "error_msg",
+    ]
+
+    @staticmethod
+    def group_by(counts: pd.Series, by: List[str]) -> List[Dict[str, Any]]:
+        df = counts.groupby(level=by, observed=True).sum().reset_index(name="count")
+        # dates are only turned into python objects for the few grouped rows
+        df["date"] = df["date"].dt.date
+        return df.to_dict(orient="records")
+
+    def breakdowns(self, jdf: pd.DataFrame) -> Dict[str, Any]:
+        jdf["date"] = jdf["startTime"].dt.normalize()
+        # the string keys are factorized once into category codes, so the
+        # groupings below hash small integers rather than python strings
+        jdf = jdf.astype({k: "category" for k in self._keys[1:]})
+        # missing keys are kept here and dropped by each rollup instead; only
+        # the small rollups are sorted
+        counts = jdf.groupby(self._keys, sort=False, dropna=False, observed=True).size()
+        # only the keys of the dataset count are repeated for each dataset; jobs
+        # without any would only add missing keys that the rollup drops
+        ds = jdf["queriedDatasets"]
+        lens = np.fromiter(
+            (len(v) if isinstance(v, list) else 0 for v in ds),
+            dtype=np.intp,
+            count=len(ds),
+        )
+        flat = jdf[["date", "state"]].take(np.repeat(np.arange(len(jdf)), lens))
+        flat["queriedDatasets"] = list(
+            chain.from_iterable(v for v in ds if isinstance(v, list))
+        )
+        by = ["date", "queriedDatasets", "state"]
+        datasets = flat.groupby(by, sort=False, observed=True).size()
+
+        # lookup only those who have erorrs to get detailed error messages
+        return {
+            "Number of jobs over 7 days": jdf.shape[0],
+            "Job categories by day, queryType and state": self.group_by(
+                counts, ["date", "queryType", "state"]
+            ),
+            "Job count by day, queryType and engine": self.group_by(
+                counts, ["date", "queryType", "engine"]
+            ),
+            "Job count by day, queryType, user": self.group_by(
+                counts, ["date", "queryType", "user"]
+            ),
+            "Job count by day, queriedDataset and state": self.group_by(datasets, by),
+            "Job count by day, queryType and error": self.group_by(
+                counts, ["date", "queryType", "error_msg"]
+            ),
+        }
 
     async def invoke(self) -> Dict[str, Any]:
         """Get the stats and details of failed or canceled jobs executed in the Dremio cluster in the past 7 days
@@ -202,12 +317,9 @@ class GetFailedJobDetails(Tools):
             else "sys.jobs_recent"
         )
         query = f"""/* dremioai: submitter={self.__class__.__name__} */
-            select job_id as id,
-            query_type as queryType,
+            select query_type as queryType,
             status as state,
             submitted_ts as startTime,
-            query,
-            (final_state_epoch_millis - submitted_epoch_millis) / 1000 as duration,
             queried_datasets as queriedDatasets,
                     user_name as "user",
             engine,
@@ -215,30 +327,13 @@ class GetFailedJobDetails(Tools):
             from   {table}
             where to_date(submitted_ts) >= current_date - interval '7' day
             and status in ('CANCELED', 'FAILED')"""
+        # only the columns the breakdowns need are fetched; the counting stays
+        # here so that all of them come out of a single job
         try:
             jdf = await sql.run_query(query=query, use_df=True)
-            jdf["date"] = jdf["startTime"].dt.date
-
-            # lookup only those who have erorrs to get detailed error messages
-            return {
-                "Number of jobs over 7 days": jdf.shape[0],
-                "Job categories by day, queryType and state": self.group_by(
-                    jdf, ["date", "queryType", "state"]
-                ),
-                "Job count by day, queryType and engine": self.group_by(
-                    jdf, ["date", "queryType", "engine"]
-                ),
-                "Job count by day, queryType, user": self.group_by(
-                    jdf, ["date", "queryType", "user"]
-                ),
-                "Job count by day, queriedDataset and state": self.group_by(
-                    jdf.explode("queriedDatasets"), ["date", "queriedDatasets", "state"]
-                ),
-                "Job count by day, queryType and error": self.group_by(
-                    jdf, ["date", "queryType", "error_msg"]
-                ),
-            }
-        except RuntimeError as e:
+            # the counting is cpu bound, so it is kept off the event loop
+            return await asyncio.to_thread(self.breakdowns, jdf)
+        except sql.JobFailedError as e:
             return {
                 "error": str(e),
                 "message": "The query failed. Please check the syntax and try again",
@@ -247,33 +342,46 @@ class GetFailedJobDetails(Tools):
 
 class RunSqlQuery(Tools):
     For: ClassVar[Annotated[ToolType, ToolType.FOR_SELF | ToolType.FOR_DATA_PATTERNS]]
-    _safe = [
-        expressions.Select,
-        expressions.With,
-        expressions.Union,
-    ]
+    _dml = re.compile(
+        r"\b(drop|insert|update|truncate|delete|copy into|alter|create)\b",
+        re.IGNORECASE,
+    )
+    # a lone statement that starts with select or with and has none of these
+    # words can only be a query, so it is let through without building the
+    # whole tree
+    _comments = re.compile(r"\s*(?:(?:/\*.*?\*/|--[^\n]*)\s*)*", re.DOTALL)
+    _query_start = re.compile(r"(?:select|with)\b", re.IGNORECASE)
+    _not_select = re.compile(
+        r";|\b(drop|insert|update|truncate|delete|copy|alter|create|merge"
+        r"|except|intersect|minus)\b",
+        re.IGNORECASE,
+    )
 
     @staticmethod
     def ensure_query_allowed(s: str):
         if settings.instance().dremio.allow_dml:
             return
 
+        start = RunSqlQuery._comments.match(s).end()
+        if RunSqlQuery._query_start.match(s, start):
+            if not RunSqlQuery._not_select.search(s.rstrip().rstrip(";")):
+                return
+
+        # sqlglot takes a while to import and is only needed from here on
+        from sqlglot import parse_one, expressions
+
         try:
             q = parse_one(s)
-            if any(isinstance(q, t) for t in RunSqlQuery._safe):
+            if isinstance(q, (expressions.Select, expressions.With, expressions.Union)):
                 return
         except:
-            if not re.search(
-                r"\b(drop|insert|update|truncate|delete|copy into|alter|create)\b",
-                s,
-                re.IGNORECASE,
-            ):
+            if not RunSqlQuery._dml.search(s):
                 return
         raise ValueError(
             "The query contains a DML statement. Only select queries are allowed"
         )
 
-    async def invoke(self, s: str) -> Dict[str, List[Dict[Any, Any]]]:
+    async def invoke(self, s: str) -> Dict[str, Union[str, List[Dict[Any, Any]]]]:
         """Run a SELECT sql query on the Dremio cluster and return the results.
         Ensure that SQL keywords like 'day', 'month', 'count', 'table' etc are enclosed in double quotes
         You are premitted to run only SELECT queries. No DML statements are allowed.
@@ -284,9 +392,31 @@ class RunSqlQuery(Tools):
         RunSqlQuery.ensure_query_allowed(s)
         try:
             s = f"/* dremioai: submitter={self.__class__.__name__} */\n{s}"
-            df = await sql.run_query(query=s, use_df=True)
-            return {"result": df.to_dict(orient="records")}
-        except RuntimeError as e:
+            # the rows are passed on as decoded rather than round tripped
+            # through a frame; only rows missing null columns are filled in
+            jr = await sql.run_query(
+                query=s, max_rows=settings.instance().dremio.max_result_rows
+            )
+            # without a schema there is nothing to fill the rows in from
+            cols = [rs.name for rs in jr[0].result_schema or ()] if jr else ()
+            result = {
+                "result": [
+                    (
+                        row
+                        if not cols or len(row) == len(cols)
+                        else {c: row.get(c) for c in cols}
+                    )
+                    for r in jr
+                    for row in r.rows
+                ]
+            }
+            # the row count of each page is that of the whole result
+            if jr and (total := jr[0].row_count) > len(result["result"]):
+                result["message"] = (
+                    f"Only the first {len(result['result'])} of {total} rows are returned"
+                )
+            return result
+        except sql.JobFailedError as e:
             return {
                 "error": str(e),
                 "message": "The query failed. Please check the syntax and try again",
@@ -322,6 +452,8 @@ class BuildUsageReport(Tools):
 
 
 class Resource(Tools):
+    _registry: ClassVar[List[type]] = _RESOURCE_CLASSES
+
     @property
     def resource_path(self):
         raise NotImplementedError("Subclasses should implement this method")
@@ -378,11 +510,7 @@ class GetSchemaOfTable(Tools):
             that give column names and types. Optionally :"text" field and "tag" filed can provide more
             information about the table
         """
-        if isinstance(table_name, list):
-            paths = table_name
-        else:
-            paths = list(reader(StringIO(table_name), delimiter="."))
-        result = await get_schema(paths[0], include_tags=True)
+        result = await get_schema(table_name, include_tags=True)
         if result and "sql" in result:
             del result["sql"]
         return result
@@ -423,51 +551,32 @@ class SearchTableAndViews(Tools):
             key that lists the entire schema of the table or view. You can rely on this schema and avoid
             calling GetSchemaOfTable tool.
         """
+        # the found rows are returned as built, not round tripped through frames
         res = await run_in_parallel(
             [
-                search.get_search_results(
-                    search.Search(query=query, filter=category), use_df=True
-                )
+                search.get_search_records(search.Search(query=query, filter=category))
                 for category in (search.Category.TABLE, search.Category.VIEW)
             ]
         )
-        res = pd.concat(res)
-        return {"results": res.to_dict(orient="records")}
-
-
-def _subclasses(cls):
-    for sub in cls.__subclasses__():
-        yield from _subclasses(sub)
-        yield sub
+        return {"results": [r for rows in res for r in rows]}
 
 
 def get_tools(For: ToolType = None) -> List[Tools]:
-    return [
-        sc
-        for sc in _subclasses(Tools)
-        if sc is not Resource
-        and not issubclass(sc, Resource)
-        and (For is None or is_tool_for(sc, For))
-    ]
+    return [sc for sc in _TOOL_CLASSES if For is None or is_tool_for(sc, For)]
 
 
 def get_resources(For: ToolType = None):
     return [
         sc
-        for sc in _subclasses(Resource)
+        for sc in _RESOURCE_CLASSES
         if sc is not Resource and (For is None or is_tool_for(sc, For))
     ]
 
 
 def system_prompt():
-    For = settings.instance().tools.server_mode
-    get_tools_prompt = lambda t: "\n\t".join(t.invoke.__doc__.splitlines())
-    all_tools = "\n".join(
-        f"{t.__name__}: {get_tools_prompt(t)}"
-        for t in (get_tools(For) + get_resources(For))
-    )
-
-    return f"""
+    # the tools reach the model through their own descriptions, so the prompt
+    # does not depend on the server mode and is the same constant every call
+    return """
     You are helpful AI bot with access to several tools for analyzing Dremio cluster, data, tables and jobs.
     Note:
     - In general prefer to illustrate results using interactive graphical plots
@@ -534,17 +643,19 @@ class GetMetricSchema(Tools):
 class RunPromQL(Tools):
     For: ClassVar[Annotated[ToolType, ToolType.FOR_PROMETHEUS]]
 
-    async def invoke(self, promql_query: str) -> Dict[str, Any]:
+    async def invoke(self, promql_query: str, step: str = "1h") -> List[Dict[str, Any]]:
         """
         Runs a prometheus query, over the last 7 days and returns the results
 
         Args:
           promql_query: The PromQL query to run
+          step: The interval between samples, e.g. 1h or 6h; a wider step returns fewer samples
+
+        Returns: A list with one entry per series, with its name, labels and
+            the time and value of its samples as lists of the same length
         """
-        df = await vm.get_promql_result(
-            promql_query, start="-7d", step="1h", use_df=True
-        )
-        return df.to_dict(orient="records")
+        result = await vm.get_promql_result(promql_query, start="-7d", step=step)
+        return vm.as_series(result.data)
 
 
 class GetDescriptionOfTableOrSchema(Tools):
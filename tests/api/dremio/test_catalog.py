@@ -0,0 +1,51 @@
+#
+#  Copyright (C) 2017-2025 Dremio Corporation
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import itertools
+import pytest
+from csv import reader, excel
+from io import StringIO
+from dremioai.api.dremio.catalog import split_path
+
+
+@pytest.mark.parametrize(
+    "path,expected",
+    [
+        pytest.param("a.b.c", ["a", "b", "c"], id="plain"),
+        pytest.param('"a.b".c', ["a.b", "c"], id="quoted dot"),
+        pytest.param('space."my folder".t', ["space", "my folder", "t"], id="space"),
+        pytest.param('"a""b".c', ['a"b', "c"], id="escaped quote"),
+        pytest.param("abc", ["abc"], id="single"),
+        pytest.param('"abc"def.x', ["abcdef", "x"], id="quoted then plain"),
+        pytest.param('a."b"c', ["a", "bc"], id="plain after quote"),
+        pytest.param('a"b.c', ['a"b', "c"], id="quote inside plain"),
+        pytest.param("a..b", ["a", "", "b"], id="empty component"),
+        pytest.param(".a", ["", "a"], id="leading dot"),
+        pytest.param("a.", ["a", ""], id="trailing dot"),
+        pytest.param('a."b.c', ["a", "b.c"], id="unclosed quote"),
+    ],
+)
+def test_split_path(path: str, expected: list):
+    assert split_path(path) == expected
+
+
+def test_split_path_reads_like_csv():
+    # every path of up to six plain characters, quotes and dots
+    for n in range(1, 7):
+        for chars in itertools.product('a".', repeat=n):
+            path = "".join(chars)
+            expected = next(reader(StringIO(path), delimiter=".", dialect=excel))
+            assert split_path(path) == expected, path
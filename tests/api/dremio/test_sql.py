@@ -15,7 +15,9 @@
 #
 
 import pytest
-from dremioai.api.dremio.sql import Job
+from unittest.mock import AsyncMock, patch
+from dremioai.api.dremio import sql
+from dremioai.api.dremio.sql import Job, JobFailedError, JobResults
 
 
 @pytest.mark.parametrize(
@@ -52,3 +54,45 @@ from dremioai.api.dremio.sql import Job
 )
 def test_basic_job(js: str):
     j = Job.model_validate_json(js)
+
+
+def test_job_failed_error_is_bounded():
+    e = JobFailedError("1234", "boom\n" + "at frame\n" * 1000)
+    assert isinstance(e, RuntimeError)
+    assert e.job_id == "1234"
+    assert str(e).startswith("Job 1234 failed: boom")
+    assert len(e.message) == 2048
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "max_rows,pages",
+    [
+        pytest.param(None, [(0, 500), (500, 500), (1000, 234)], id="all rows"),
+        pytest.param(5000, [(0, 500), (500, 500), (1000, 234)], id="above count"),
+        pytest.param(1100, [(0, 500), (500, 500), (1000, 100)], id="last page cut"),
+        pytest.param(120, [(0, 120)], id="single page"),
+    ],
+)
+async def test_get_results_fetches_only_max_rows(max_rows, pages):
+    job = Job.model_validate(
+        {"jobState": "COMPLETED", "rowCount": 1234, "queryType": "REST"}
+    )
+    client = AsyncMock()
+    client.get.return_value = job
+
+    async def fetch(uri, pat, project_id, job_id, off, limit):
+        return JobResults.model_validate(
+            {
+                "rowCount": 1234,
+                "schema": [{"name": "n", "type": {"name": "INTEGER"}}],
+                "rows": [{"n": n} for n in range(off, off + limit)],
+            }
+        )
+
+    with patch.object(sql, "_fetch_results", side_effect=fetch) as fetched:
+        jr = await sql.get_results(None, "1234", client=client, max_rows=max_rows)
+
+    assert [c.args[-2:] for c in fetched.call_args_list] == pages
+    rows = [row["n"] for r in jr for row in r.rows]
+    assert rows == list(range(min(1234, max_rows or 1234)))
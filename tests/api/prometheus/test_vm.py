@@ -0,0 +1,81 @@
+#
+#  Copyright (C) 2017-2025 Dremio Corporation
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import pytest
+from datetime import datetime
+from dremioai.api.prometheus.vm import PromQLResult, as_series
+
+
+def _result(result_type: str, result):
+    return PromQLResult.model_validate(
+        {"status": "success", "data": {"resultType": result_type, "result": result}}
+    )
+
+
+def test_matrix_as_series():
+    r = _result(
+        "matrix",
+        [
+            {
+                "metric": {"__name__": "up", "job": "dremio"},
+                "values": [[1700000000, "1"], [1700003600, "0"]],
+            },
+            {"metric": {"__name__": "up", "job": "other"}, "values": None},
+        ],
+    )
+    assert as_series(r.data) == [
+        {
+            "name": "up",
+            "labels": "job=dremio",
+            "time": [
+                datetime.fromtimestamp(1700000000),
+                datetime.fromtimestamp(1700003600),
+            ],
+            "value": [1.0, 0.0],
+        },
+        {"name": "up", "labels": "job=other", "time": [], "value": []},
+    ]
+
+
+def test_vector_as_series():
+    r = _result("vector", [{"metric": {"__name__": "up"}, "value": [1700000000, "1"]}])
+    assert as_series(r.data) == [
+        {
+            "name": "up",
+            "labels": "",
+            "time": [datetime.fromtimestamp(1700000000)],
+            "value": [1.0],
+        }
+    ]
+
+
+@pytest.mark.parametrize(
+    "result_type,value,expected",
+    [
+        pytest.param("scalar", "2.5", 2.5, id="scalar"),
+        pytest.param("string", "hello", "hello", id="string"),
+    ],
+)
+def test_scalar_and_string_as_series(result_type, value, expected):
+    r = _result(result_type, [1700000000, value])
+    assert as_series(r.data) == [
+        {
+            "name": None,
+            "labels": "",
+            "time": [datetime.fromtimestamp(1700000000)],
+            "value": [expected],
+        }
+    ]
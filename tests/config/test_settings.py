@@ -111,3 +111,10 @@ def test_experimental_rename(name: str, value: bool):
         {name: value, "uri": "https://foo", "pat": "bar"}
     )
     assert d.enable_search == value
+
+
+@pytest.mark.parametrize("size", [None, 0, -1])
+def test_sliding_memory_size_must_be_positive(size):
+    with pytest.raises(ValueError):
+        settings.LangChain.model_validate({"sliding_memory_size": size})
+    assert settings.LangChain().sliding_memory_size == 8
@@ -38,6 +38,10 @@ class MockResponse:
         """Return the mock data as text"""
         return self.data
 
+    async def read(self) -> bytes:
+        """Return the mock data as bytes"""
+        return self.data.encode()
+
     async def json(self) -> Dict[str, Any]:
         """Return the mock data as JSON"""
         return json.loads(self.data)
@@ -0,0 +1,186 @@
+#
+#  Copyright (C) 2017-2025 Dremio Corporation
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import asyncio
+import pytest
+import time
+from contextlib import contextmanager
+from threading import Event
+from unittest.mock import patch
+
+from dremioai.config import settings
+from dremioai.config.tools import ToolType
+from dremioai.servers.frameworks.langchain import tools as lc_tools
+from dremioai.tools.tools import get_tools
+
+
+def test_encoding_load_is_bounded():
+    """A stalled encoding download must not hold up the caller"""
+    release = Event()
+
+    def stalled(loaded):
+        release.wait()
+        loaded.set_exception(RuntimeError("offline"))
+
+    with (
+        patch.object(lc_tools, "_encoding_load", None),
+        patch.object(lc_tools, "_load_encoding", stalled),
+        patch.object(lc_tools, "_ENCODING_WAIT_SECONDS", 0.05),
+    ):
+        start = time.monotonic()
+        assert lc_tools._encoding() is None
+        assert lc_tools._encoding() is None
+        assert time.monotonic() - start < 1
+        release.set()
+
+
+@pytest.mark.parametrize("enable_search", [False, True])
+def test_discover_tools_follows_settings(enable_search):
+    """The cached tools must follow the settings that select them"""
+    old = settings.instance()
+    try:
+        settings._settings.set(
+            settings.Settings.model_validate(
+                {
+                    "dremio": {
+                        "uri": "https://test-dremio-uri.com",
+                        "pat": "test-pat",
+                        "enable_search": enable_search,
+                    }
+                }
+            )
+        )
+        discovered = lc_tools.discover_tools(ToolType.FOR_DATA_PATTERNS)
+        assert isinstance(discovered, tuple)
+        assert [t.name for t in discovered] == [
+            t.__name__ for t in get_tools(For=ToolType.FOR_DATA_PATTERNS)
+        ]
+        assert ("SearchTableAndViews" in {t.name for t in discovered}) == enable_search
+    finally:
+        settings._settings.set(old)
+
+
+@contextmanager
+def dml_allowed(allowed: bool):
+    old = settings.instance()
+    try:
+        settings._settings.set(
+            settings.Settings.model_validate(
+                {
+                    "dremio": {
+                        "uri": "https://test-dremio-uri.com",
+                        "pat": "test-pat",
+                        "allow_dml": allowed,
+                    }
+                }
+            )
+        )
+        yield
+    finally:
+        settings._settings.set(old)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("allowed,expected_calls", [(False, 2), (True, 4)])
+async def test_coalesced_shares_identical_calls(allowed, expected_calls):
+    calls = []
+
+    async def invoke(*args, **kw):
+        calls.append((args, kw))
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    coalesced = lc_tools._coalesced(invoke)
+    with dml_allowed(allowed):
+        results = await asyncio.gather(
+            coalesced("a", step="1h"),
+            coalesced("a", step="1h"),
+            coalesced("b"),
+            coalesced("b"),
+        )
+        assert len(calls) == expected_calls
+        if not allowed:
+            assert results[0] == results[1] and results[2] == results[3]
+            # nothing is kept once the shared call is done
+            await coalesced("a", step="1h")
+            assert len(calls) == expected_calls + 1
+
+
+@pytest.mark.asyncio
+async def test_coalesced_survives_a_cancelled_caller():
+    release = asyncio.Event()
+
+    async def invoke():
+        await release.wait()
+        return "done"
+
+    coalesced = lc_tools._coalesced(invoke)
+    with dml_allowed(False):
+        first = asyncio.ensure_future(coalesced())
+        second = asyncio.ensure_future(coalesced())
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        assert await second == "done"
+
+
+class _CharEncoding:
+    """One token per character, so that token counts are easy to follow"""
+
+    def encode(self, s):
+        return list(s)
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+
+def test_truncate_keeps_short_descriptions():
+    with patch.object(lc_tools, "_encoding", return_value=_CharEncoding()):
+        assert lc_tools._truncate_for_llm("Runs a query.  ") == "Runs a query."
+
+
+def test_truncate_cuts_at_the_token_budget_on_a_word():
+    doc = "alpha beta gamma delta"
+    with patch.object(lc_tools, "_encoding", return_value=_CharEncoding()):
+        assert lc_tools._truncate_for_llm(doc, max_tokens=13) == "alpha beta"
+
+
+def test_truncate_prefers_whole_paragraphs():
+    doc = "First paragraph.\n\nSecond paragraph that is long"
+    with patch.object(lc_tools, "_encoding", return_value=_CharEncoding()):
+        assert lc_tools._truncate_for_llm(doc, max_tokens=30) == "First paragraph."
+
+
+def test_truncate_caps_characters():
+    doc = "word " * 1000
+    with patch.object(lc_tools, "_encoding", return_value=_CharEncoding()):
+        cut = lc_tools._truncate_for_llm(doc, max_tokens=5000)
+    assert len(cut) <= lc_tools._MAX_DESCRIPTION_CHARS
+    assert cut.endswith("word")
+
+
+def test_truncate_without_encoding_uses_characters():
+    doc = "word " * 1000
+    with patch.object(lc_tools, "_encoding", return_value=None):
+        cut = lc_tools._truncate_for_llm(doc, max_tokens=10)
+    assert cut == ("word " * 8).rstrip()
+
+
+def test_truncate_default_budget():
+    doc = "word " * 1000
+    with patch.object(lc_tools, "_encoding", return_value=_CharEncoding()):
+        cut = lc_tools._truncate_for_llm(doc)
+    assert cut == ("word " * 51).rstrip()
@@ -114,3 +114,74 @@ def test_claude_config_creation(claude_config_path):
     assert claude_config_path.exists()
     d = json.load(claude_config_path.open())
     assert d["mcpServers"] == dcmp
+
+
+@pytest.mark.asyncio
+async def test_mcp_server_listings_cached():
+    from dremioai.servers.fastmcp import FastMCP
+    from mcp.server.fastmcp.prompts import Prompt
+
+    with mock_settings(ToolType.FOR_SELF):
+        app = mcp_server.init(mode=ToolType.FOR_SELF)
+        prompts = await app.list_prompts()
+        assert await app.list_prompts() is prompts
+        resources = await app.list_resources()
+        assert await app.list_resources() is resources
+        tools = await app.list_tools()
+        assert await app.list_tools() is tools
+
+    app = FastMCP("test")
+    assert await app.list_prompts() == []
+    app.add_prompt(Prompt.from_function(lambda: "hello", "hello", "hello"))
+    assert [p.name for p in await app.list_prompts()] == ["hello"]
+    assert await app.list_tools() == []
+    app.add_tool(lambda: "hello", name="hello")
+    assert [t.name for t in await app.list_tools()] == ["hello"]
+
+
+@pytest.mark.asyncio
+async def test_mcp_server_bounds_tool_calls():
+    import asyncio
+    from dremioai.servers.fastmcp import FastMCP
+
+    in_flight, peak = 0, 0
+
+    async def slow() -> str:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return "done"
+
+    app = FastMCP("test", max_concurrent_tools=2)
+    app.add_tool(slow, name="slow")
+    await asyncio.gather(*(app.call_tool("slow", {}) for _ in range(5)))
+    assert peak == 2
+
+
+def test_mcp_server_tool_slots_follow_the_loop():
+    import asyncio
+    from dremioai.servers.fastmcp import FastMCP
+
+    async def slow() -> str:
+        await asyncio.sleep(0.01)
+        return "done"
+
+    app = FastMCP("test", max_concurrent_tools=1)
+    app.add_tool(slow, name="slow")
+
+    async def burst():
+        await asyncio.gather(*(app.call_tool("slow", {}) for _ in range(3)))
+
+    # a server built once is used from a fresh loop by every asyncio.run
+    asyncio.run(burst())
+    asyncio.run(burst())
+    assert len(app._tool_slots) == 1
+
+
+def test_mcp_server_max_concurrent_tools_from_settings():
+    with mock_settings(ToolType.FOR_SELF):
+        settings.instance().tools.max_concurrent_tools = 3
+        app = mcp_server.init(mode=ToolType.FOR_SELF)
+    assert app._max_concurrent_tools == 3
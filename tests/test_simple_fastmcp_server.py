@@ -17,12 +17,12 @@
 import pytest
 from contextlib import contextmanager
 from unittest.mock import AsyncMock, patch
-import pandas as pd
 
 from dremioai.servers import mcp as mcp_server
 from dremioai.config.tools import ToolType
 from dremioai.config import settings
 from dremioai.tools.tools import get_tools
+from dremioai.api.dremio.sql import JobResults, JobResultsWrapper
 
 
 class TestSimpleFastMCPServer:
@@ -88,8 +88,17 @@ class TestSimpleFastMCPServer:
             
             # Test RunSqlQuery tool with proper mocking
             with patch("dremioai.api.dremio.sql.run_query", new_callable=AsyncMock) as mock_run_query:
-                mock_df = pd.DataFrame([{"test_column": 1}])
-                mock_run_query.return_value = mock_df
+                mock_run_query.return_value = JobResultsWrapper(
+                    [
+                        JobResults.model_validate(
+                            {
+                                "rowCount": 1,
+                                "schema": [{"name": "test_column", "type": {"name": "INTEGER"}}],
+                                "rows": [{"test_column": 1}],
+                            }
+                        )
+                    ]
+                )
                 
                 # Call the tool
                 result = await fastmcp_server.call_tool(
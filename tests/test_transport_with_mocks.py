@@ -16,15 +16,18 @@
 
 import pytest
 import asyncio
+import gc
 from contextlib import contextmanager
 from unittest.mock import AsyncMock, patch
 import pandas as pd
 
+from dremioai.api import transport
 from dremioai.api.transport import AsyncHttpClient
 from dremioai.servers import mcp as mcp_server
 from dremioai.config.tools import ToolType
 from dremioai.config import settings
 from dremioai.tools.tools import get_tools
+from dremioai.api.dremio.sql import JobResults, JobResultsWrapper
 from tests.mocks.http_mock import mock_http_client
 
 
@@ -66,6 +69,27 @@ class TestTransportWithMocks:
             assert result["rowCount"] == 42
             assert result["id"] == "job123-456-789"
 
+    @pytest.mark.asyncio
+    async def test_session_is_shared_within_loop(self):
+        """Test that requests on one event loop reuse a single pooled session"""
+        session = await transport._session()
+        assert await transport._session() is session
+
+        await transport.close_session()
+        assert session.closed
+        assert await transport._session() is not session
+        await transport.close_session()
+        assert not transport._sessions
+
+    def test_session_is_closed_with_its_loop(self):
+        """Test that a session does not outlive the asyncio.run that opened it"""
+        opened = [asyncio.run(transport._session()) for _ in range(2)]
+        gc.collect()
+
+        assert opened[0] is not opened[1]
+        assert all(session.closed for session in opened)
+        assert not transport._sessions
+
     @pytest.mark.asyncio
     async def test_async_http_client_with_params(self):
         """Test AsyncHttpClient with query parameters"""
@@ -162,8 +186,22 @@ class TestTransportWithMocks:
                                 "dremioai.api.dremio.sql.run_query",
                                 new_callable=AsyncMock,
                             ) as mock_run_query:
-                                mock_df = pd.DataFrame([{"test_column": 1}])
-                                mock_run_query.return_value = mock_df
+                                mock_run_query.return_value = JobResultsWrapper(
+                                    [
+                                        JobResults.model_validate(
+                                            {
+                                                "rowCount": 1,
+                                                "schema": [
+                                                    {
+                                                        "name": "test_column",
+                                                        "type": {"name": "INTEGER"},
+                                                    }
+                                                ],
+                                                "rows": [{"test_column": 1}],
+                                            }
+                                        )
+                                    ]
+                                )
 
                                 result = await fastmcp_server.call_tool(
                                     tool.name, {"s": "SELECT 1 as test_column"}
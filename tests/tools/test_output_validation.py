@@ -15,9 +15,14 @@
 #
 
 import pytest
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 from mcp.server.fastmcp.utilities.func_metadata import func_metadata
-from dremioai.tools.tools import GetUsefulSystemTableNames, GetSchemaOfTable
+from dremioai.tools.tools import (
+    GetUsefulSystemTableNames,
+    GetSchemaOfTable,
+    RunSqlQuery,
+)
+from dremioai.api.dremio.sql import JobResults, JobResultsWrapper
 
 
 async def mock_mcp_validate_tool_output(tool, *args, **kwargs):
@@ -59,3 +64,23 @@ async def test_get_schema_of_table_validation():
 
     with patch("dremioai.tools.tools.get_schema", return_value=mock_schema_result):
         await mock_mcp_validate_tool_output(tool, "sys.jobs")
+
+
+@pytest.mark.asyncio
+async def test_run_sql_query_truncated_validation():
+    tool = RunSqlQuery()
+    jr = JobResultsWrapper(
+        [
+            JobResults.model_validate(
+                {
+                    "rowCount": 10,
+                    "schema": [{"name": "a", "type": {"name": "INTEGER"}}],
+                    "rows": [{"a": 1}],
+                }
+            )
+        ]
+    )
+
+    with patch("dremioai.api.dremio.sql.run_query", new_callable=AsyncMock) as rq:
+        rq.return_value = jr
+        await mock_mcp_validate_tool_output(tool, "SELECT a FROM t")
@@ -15,7 +15,8 @@
 #
 
 import pytest
-from dremioai.tools.tools import RunSqlQuery
+from dremioai.tools.tools import RunSqlQuery, GetFailedJobDetails, RunPromQL
+from dremioai.api.dremio.sql import JobResults, JobResultsWrapper
 from dremioai.config import settings
 from typing import Dict, Union
 from contextlib import contextmanager, asynccontextmanager
@@ -402,6 +403,18 @@ WHERE is_deleted = false
         "allowed": False,
         "comment": "COPY INTO statement",
     },
+    {
+        "sql": """/* dremioai: submitter=test */
+-- the most recent jobs
+SELECT job_id FROM sys.jobs_recent LIMIT 10""",
+        "allowed": True,
+        "comment": "SELECT after leading comments",
+    },
+    {
+        "sql": "SELECT * FROM users WHERE name = 'drop'",
+        "allowed": True,
+        "comment": "SELECT with a DML word in a literal",
+    },
 ]
 
 
@@ -581,11 +594,20 @@ async def test_run_sql_query_through_fastmcp_direct():
         with patch(
             "dremioai.api.dremio.sql.run_query", new_callable=AsyncMock
         ) as mock_run_query:
-            # Create a mock DataFrame response
-            import pandas as pd
-
-            mock_df = pd.DataFrame([{"test_column": 1}])
-            mock_run_query.return_value = mock_df
+            # Create a mock job results response
+            mock_run_query.return_value = JobResultsWrapper(
+                [
+                    JobResults.model_validate(
+                        {
+                            "rowCount": 1,
+                            "schema": [
+                                {"name": "test_column", "type": {"name": "INTEGER"}}
+                            ],
+                            "rows": [{"test_column": 1}],
+                        }
+                    )
+                ]
+            )
 
             # Initialize FastMCP server with tools
             fastmcp_server = mcp_server.init(mode=ToolType.FOR_DATA_PATTERNS)
@@ -601,7 +623,7 @@ async def test_run_sql_query_through_fastmcp_direct():
             # Verify the mock was called with correct parameters
             mock_run_query.assert_called_once_with(
                 query=f"/* dremioai: submitter=RunSqlQuery */\n{test_query}",
-                use_df=True,
+                max_rows=None,
             )
 
             # FastMCP call_tool returns a tuple: (content_blocks, metadata)
@@ -625,3 +647,197 @@ async def test_run_sql_query_through_fastmcp_direct():
 
             content_json = json.loads(content_blocks[0].text)
             assert content_json == actual_result
+
+
+@pytest.mark.asyncio
+async def test_run_sql_query_fills_null_columns():
+    from unittest.mock import AsyncMock, patch
+
+    schema = [
+        {"name": "a", "type": {"name": "INTEGER"}},
+        {"name": "b", "type": {"name": "VARCHAR"}},
+    ]
+    jr = JobResultsWrapper(
+        [
+            JobResults.model_validate(
+                {"rowCount": 1, "schema": schema, "rows": [{"a": 1, "b": "x"}]}
+            ),
+            JobResults.model_validate(
+                {"rowCount": 1, "schema": schema, "rows": [{"a": 2}]}
+            ),
+        ]
+    )
+    with mock_settings(False):
+        with patch("dremioai.api.dremio.sql.run_query", new_callable=AsyncMock) as rq:
+            rq.return_value = jr
+            result = await RunSqlQuery().invoke("SELECT a, b FROM t")
+    assert result == {"result": [{"a": 1, "b": "x"}, {"a": 2, "b": None}]}
+
+
+@pytest.mark.asyncio
+async def test_failed_job_details_match_plain_groupbys():
+    from unittest.mock import AsyncMock, patch
+    import pandas as pd
+
+    jobs = pd.DataFrame(
+        {
+            "queryType": ["UI_RUN", "UI_RUN", None, "ODBC", "UI_RUN", "ODBC"],
+            "state": ["FAILED", "CANCELED", "FAILED", "FAILED", "FAILED", "FAILED"],
+            "startTime": pd.to_datetime(
+                [
+                    "2025-01-01 10:00",
+                    "2025-01-01 23:59",
+                    "2025-01-02 01:00",
+                    "2025-01-02 02:00",
+                    "2025-01-03 03:00",
+                    "2025-01-03 04:00",
+                ]
+            ),
+            "queriedDatasets": [["a", "b"], [], None, ["a"], ["b", "b"], ["c"]],
+            "user": ["u1", "u2", "u1", None, "u1", "u2"],
+            "engine": ["e1", None, "e1", "e2", "e1", "e2"],
+            "error_msg": ["boom", None, "boom", "oops", "boom", None],
+        }
+    )
+
+    # the breakdowns as the per column groupbys used to produce them
+    expected_jobs = jobs.copy()
+    expected_jobs["date"] = expected_jobs["startTime"].dt.date
+
+    def group_by(df, by):
+        return df.groupby(by).size().reset_index(name="count").to_dict("records")
+
+    expected = {
+        "Number of jobs over 7 days": len(jobs),
+        "Job categories by day, queryType and state": group_by(
+            expected_jobs, ["date", "queryType", "state"]
+        ),
+        "Job count by day, queryType and engine": group_by(
+            expected_jobs, ["date", "queryType", "engine"]
+        ),
+        "Job count by day, queryType, user": group_by(
+            expected_jobs, ["date", "queryType", "user"]
+        ),
+        "Job count by day, queriedDataset and state": group_by(
+            expected_jobs.explode("queriedDatasets"),
+            ["date", "queriedDatasets", "state"],
+        ),
+        "Job count by day, queryType and error": group_by(
+            expected_jobs, ["date", "queryType", "error_msg"]
+        ),
+    }
+
+    with mock_settings(False):
+        with patch("dremioai.api.dremio.sql.run_query", new_callable=AsyncMock) as rq:
+            rq.return_value = jobs.copy()
+            result = await GetFailedJobDetails().invoke()
+
+    assert result == expected
+    for key, rows in expected.items():
+        if isinstance(rows, list):
+            assert [list(map(type, r.values())) for r in result[key]] == [
+                list(map(type, r.values())) for r in rows
+            ], key
+
+
+@pytest.mark.asyncio
+async def test_run_sql_query_reports_truncation():
+    from unittest.mock import AsyncMock, patch
+
+    schema = [{"name": "a", "type": {"name": "INTEGER"}}]
+    jr = JobResultsWrapper(
+        [
+            JobResults.model_validate(
+                {"rowCount": 1234, "schema": schema, "rows": [{"a": 1}, {"a": 2}]}
+            )
+        ]
+    )
+    with mock_settings(False):
+        with patch("dremioai.api.dremio.sql.run_query", new_callable=AsyncMock) as rq:
+            rq.return_value = jr
+            result = await RunSqlQuery().invoke("SELECT a FROM t")
+    assert result == {
+        "result": [{"a": 1}, {"a": 2}],
+        "message": "Only the first 2 of 1234 rows are returned",
+    }
+
+
+@pytest.mark.asyncio
+async def test_run_sql_query_without_schema():
+    from unittest.mock import AsyncMock, patch
+
+    jr = JobResultsWrapper(
+        [JobResults.model_validate({"rowCount": 1, "schema": None, "rows": [{"a": 1}]})]
+    )
+    with mock_settings(False):
+        with patch("dremioai.api.dremio.sql.run_query", new_callable=AsyncMock) as rq:
+            rq.return_value = jr
+            result = await RunSqlQuery().invoke("SELECT a FROM t")
+    assert result == {"result": [{"a": 1}]}
+
+
+@pytest.mark.asyncio
+async def test_run_promql_returns_one_entry_per_series():
+    from unittest.mock import AsyncMock, patch
+    from dremioai.api.prometheus.vm import PromQLResult
+
+    result = PromQLResult.model_validate(
+        {
+            "status": "success",
+            "data": {
+                "resultType": "matrix",
+                "result": [
+                    {
+                        "metric": {"__name__": "up", "job": "dremio"},
+                        "values": [[1700000000, "1"], [1700003600, "0"]],
+                    }
+                ],
+            },
+        }
+    )
+    with patch(
+        "dremioai.api.prometheus.vm.get_promql_result", new_callable=AsyncMock
+    ) as q:
+        q.return_value = result
+        series = await RunPromQL().invoke("up", step="6h")
+    q.assert_awaited_once_with("up", start="-7d", step="6h")
+    assert [(s["name"], s["labels"], s["value"]) for s in series] == [
+        ("up", "job=dremio", [1.0, 0.0])
+    ]
+    assert len(series[0]["time"]) == 2
+
+
+def test_is_tool_for_follows_settings():
+    from dremioai.config.tools import ToolType
+    from dremioai.tools.tools import (
+        BuildUsageReport,
+        SearchTableAndViews,
+        is_tool_for,
+    )
+
+    combinations = [(p, s) for p in (None, "test-project-id") for s in (False, True)]
+    old = settings.instance()
+    try:
+        # the second round is answered from the cache filled by the first
+        for project_id, enable_search in combinations * 2:
+            settings._settings.set(
+                settings.Settings.model_validate(
+                    {
+                        "dremio": {
+                            "uri": "https://test-dremio-uri.com",
+                            "pat": "test-pat",
+                            "project_id": project_id,
+                            "enable_search": enable_search,
+                        }
+                    }
+                )
+            )
+            assert is_tool_for(BuildUsageReport, ToolType.FOR_SELF) == (
+                project_id is not None
+            )
+            assert (
+                is_tool_for(SearchTableAndViews, ToolType.FOR_DATA_PATTERNS)
+                == enable_search
+            )
+    finally:
+        settings._settings.set(old)